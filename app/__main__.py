@@ -0,0 +1,185 @@
+"""
+命令行入口 (无需 PyQt6，可用于 cron / 无界面服务器)
+
+用法:
+    python -m app export [--date 2024-01-01] [--format txt jsonl csv ...] [--out 目录]
+    python -m app view --region US [--date 2024-01-01]
+    python -m app keywords --region US [--lang zh-CN] [--days 30]
+    python -m app trending [--lang zh-CN] [--days 30]
+    python -m app search 关键词 [--region US] [--limit 20]
+    python -m app regions
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+
+def _resolve_region(value):
+    """支持完整名称 ("美国 (US)") 或地区代码 ("US")"""
+    from app.config.settings import COUNTRY_CONFIGS
+    if value in COUNTRY_CONFIGS:
+        return value
+    for name in COUNTRY_CONFIGS:
+        if name.endswith(f"({value.upper()})"):
+            return name
+    raise argparse.ArgumentTypeError(f"未知地区: {value} (可用 `python -m app regions` 查看)")
+
+
+def _valid_date(value):
+    try:
+        return date.fromisoformat(value).strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD: {value}")
+
+
+def cmd_export(args):
+    from app.core.api import fetch_ip_address
+    from app.core.service import build_export_header, export_global_report
+
+    os.makedirs(args.out, exist_ok=True)
+    base_path = os.path.join(args.out, args.date)
+    location = fetch_ip_address() if args.location else None
+    header = build_export_header(args.date, f"📍 属地: {location}" if location else "")
+
+    from app.core.tracing import RunTrace, format_summary
+
+    trace = RunTrace("export")
+    start = time.perf_counter()
+    paths = export_global_report(
+        base_path, header, args.date,
+        on_region=lambda name, items, status: print(
+            f"[{time.perf_counter() - start:6.2f}s] {name}: {len(items)} 条 ({status})", file=sys.stderr),
+        deadline=args.deadline or None,
+        formats=args.format
+    )
+    trace.finish()
+    print(format_summary(trace), file=sys.stderr)
+    if args.trace:
+        print(f"trace: {trace.write_chrome_trace(args.out)}", file=sys.stderr)
+    print("\n".join(paths))
+    return 0
+
+
+def cmd_view(args):
+    from app.config.settings import COUNTRY_CONFIGS
+    from app.core.api import fetch_news_data
+    from app.core.archive import get_archive, today_str
+
+    if args.date < today_str():
+        news_list = get_archive().load(args.region, args.date)
+    else:
+        news_list = fetch_news_data(COUNTRY_CONFIGS[args.region]["url"], do_translate=True)
+    if not news_list:
+        print("获取失败或没有存档", file=sys.stderr)
+        return 1
+    for i, item in enumerate(news_list, 1):
+        print(f"{i}. {item['title']}\n   来源: {item['source']}  {item['link']}")
+    return 0
+
+
+def cmd_keywords(args):
+    from app.config.settings import COUNTRY_CONFIGS
+    from app.core.service import history_keyword_report, keyword_report
+
+    if args.days:
+        keywords_list, report = history_keyword_report(args.region, args.days, args.lang, top_k=args.top)
+    else:
+        keywords_list, report = keyword_report(COUNTRY_CONFIGS[args.region]["url"], args.lang, top_k=args.top)
+    print(report)
+    return 0 if keywords_list is not None else 1
+
+
+def cmd_trending(args):
+    from app.core.trending import format_trending_report, global_hot_topics, history_hot_topics
+
+    start = time.perf_counter()
+    if args.days:
+        result = history_hot_topics(args.days, args.lang, top_k=args.top)
+    else:
+        result = global_hot_topics(args.lang, top_k=args.top)
+    print(f"分析耗时 {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+    if not result["global"]:
+        print(f"没有近 {args.days} 天的本地存档" if args.days else "获取RSS失败", file=sys.stderr)
+        return 1
+    print(format_trending_report(result))
+    return 0
+
+
+def cmd_search(args):
+    from app.core.archive import get_archive
+
+    archive = get_archive()
+    archive.index_missing()
+    start = time.perf_counter()
+    results = archive.search(args.query, limit=args.limit, region=args.region)
+    print(f"找到 {len(results)} 条 ({(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+    for i, item in enumerate(results, 1):
+        print(f"{i}. [{item['date']} {item['region']}] {item['title']}\n   来源: {item['source']}  {item['link']}")
+    return 0 if results else 1
+
+
+def cmd_regions(args):
+    from app.config.settings import COUNTRY_CONFIGS
+    for name in COUNTRY_CONFIGS:
+        print(name)
+    return 0
+
+
+def build_parser():
+    from app.config.settings import EXPORT_DEADLINE, EXPORT_DEFAULT_FORMATS
+    from app.core.exporters import EXPORT_FORMATS
+
+    today = date.today().strftime("%Y-%m-%d")
+    parser = argparse.ArgumentParser(prog="python -m app", description="全球每日重点汇报助手 (命令行)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="导出全球日报")
+    p.add_argument("--date", type=_valid_date, default=today, help="日期，过去的日期从本地存档生成")
+    p.add_argument("--format", nargs="+", choices=list(EXPORT_FORMATS), default=EXPORT_DEFAULT_FORMATS,
+                   help="导出格式，可同时指定多个 (一次抓取全部写出；jsonl.zst 需要安装 zstandard)")
+    p.add_argument("--out", default=".", help="保存目录")
+    p.add_argument("--location", action="store_true", help="在文件头写入当前属地 (需要一次网络请求)")
+    p.add_argument("--deadline", type=float, default=EXPORT_DEADLINE,
+                   help="总时间预算 (秒)，到时输出已有结果，0 表示不限")
+    p.add_argument("--trace", action="store_true", help="把各阶段耗时写入 <out>/traces/*.json (Chrome Trace 格式)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("view", help="查看单个地区的日报")
+    p.add_argument("--region", type=_resolve_region, required=True)
+    p.add_argument("--date", type=_valid_date, default=today)
+    p.set_defaults(func=cmd_view)
+
+    p = sub.add_parser("keywords", help="单个地区的热词")
+    p.add_argument("--region", type=_resolve_region, required=True)
+    p.add_argument("--lang", choices=["zh-CN", "en"], default="zh-CN")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--days", type=int, default=0, help="统计本地存档中最近 N 天 (不联网)，0 表示实时抓取")
+    p.set_defaults(func=cmd_keywords)
+
+    p = sub.add_parser("trending", help="全球热点 (跨地区 TF-IDF / 共现)")
+    p.add_argument("--lang", choices=["zh-CN", "en"], default="zh-CN")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--days", type=int, default=0, help="统计本地存档中最近 N 天 (不联网)，0 表示实时抓取")
+    p.set_defaults(func=cmd_trending)
+
+    p = sub.add_parser("search", help="全文搜索历史存档")
+    p.add_argument("query")
+    p.add_argument("--region", type=_resolve_region, default=None)
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("regions", help="列出可用地区")
+    p.set_defaults(func=cmd_regions)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    # 关键词提取使用进程池，需要在 __main__ 保护下启动
+    sys.exit(main())
@@ -2,25 +2,114 @@
 import os
 
 # 全球主流国家/地区配置 (Google News RSS)
-# 格式: "显示名称": {"code": "地区代码", "hl": "语言代码", "gl": "地理位置", "ceid": "参数"}
+# 格式: "显示名称": {"url": RSS 地址, "lang": 新闻语言, "ttl": 可选，缓存有效期 (秒)}
+# lang 用于翻译时直接指定源语言 (与目标语言相同时不翻译)；省略时取 URL 中的 hl= 参数，再没有则逐条在本地检测
 # 提示：Google News URL 结构通常为 https://news.google.com/rss?hl={hl}&gl={gl}&ceid={ceid}
 
 COUNTRY_CONFIGS = {
-    "中国 (CN)": {"url": "https://news.google.com/rss?hl=zh-CN&gl=CN&ceid=CN:zh-CN"},
-    "美国 (US)": {"url": "https://news.google.com/rss?hl=en-US&gl=US&ceid=US:en"},
-    "英国 (UK)": {"url": "https://news.google.com/rss?hl=en-GB&gl=GB&ceid=GB:en"},
-    "日本 (JP)": {"url": "https://news.google.com/rss?hl=ja&gl=JP&ceid=JP:ja"},
-    "德国 (DE)": {"url": "https://news.google.com/rss?hl=de&gl=DE&ceid=DE:de"},
-    "法国 (FR)": {"url": "https://news.google.com/rss?hl=fr&gl=FR&ceid=FR:fr"},
-    "俄罗斯 (RU)": {"url": "https://news.google.com/rss?hl=ru&gl=RU&ceid=RU:ru"},
-    "韩国 (KR)": {"url": "https://news.google.com/rss?hl=ko&gl=KR&ceid=KR:ko"},
-    "印度 (IN)": {"url": "https://news.google.com/rss?hl=en-IN&gl=IN&ceid=IN:en"},
-    "澳大利亚 (AU)": {"url": "https://news.google.com/rss?hl=en-AU&gl=AU&ceid=AU:en"},
-    "加拿大 (CA)": {"url": "https://news.google.com/rss?hl=en-CA&gl=CA&ceid=CA:en"},
-    "巴西 (BR)": {"url": "https://news.google.com/rss?hl=pt-BR&gl=BR&ceid=BR:pt-419"},
+    "中国 (CN)": {"url": "https://news.google.com/rss?hl=zh-CN&gl=CN&ceid=CN:zh-CN", "lang": "zh-CN"},
+    "美国 (US)": {"url": "https://news.google.com/rss?hl=en-US&gl=US&ceid=US:en", "lang": "en"},
+    "英国 (UK)": {"url": "https://news.google.com/rss?hl=en-GB&gl=GB&ceid=GB:en", "lang": "en"},
+    "日本 (JP)": {"url": "https://news.google.com/rss?hl=ja&gl=JP&ceid=JP:ja", "lang": "ja"},
+    "德国 (DE)": {"url": "https://news.google.com/rss?hl=de&gl=DE&ceid=DE:de", "lang": "de"},
+    "法国 (FR)": {"url": "https://news.google.com/rss?hl=fr&gl=FR&ceid=FR:fr", "lang": "fr"},
+    "俄罗斯 (RU)": {"url": "https://news.google.com/rss?hl=ru&gl=RU&ceid=RU:ru", "lang": "ru"},
+    "韩国 (KR)": {"url": "https://news.google.com/rss?hl=ko&gl=KR&ceid=KR:ko", "lang": "ko"},
+    "印度 (IN)": {"url": "https://news.google.com/rss?hl=en-IN&gl=IN&ceid=IN:en", "lang": "en"},
+    "澳大利亚 (AU)": {"url": "https://news.google.com/rss?hl=en-AU&gl=AU&ceid=AU:en", "lang": "en"},
+    "加拿大 (CA)": {"url": "https://news.google.com/rss?hl=en-CA&gl=CA&ceid=CA:en", "lang": "en"},
+    "巴西 (BR)": {"url": "https://news.google.com/rss?hl=pt-BR&gl=BR&ceid=BR:pt-419", "lang": "pt"},
 }
 
 IP_API_URL = "http://ip-api.com/json/?lang=zh-CN"
 
+# 并发抓取配置
+# FETCH_MAX_WORKERS: 同时抓取的地区数上限
+# PER_HOST_MIN_INTERVAL: 同一主机两次请求之间的最小间隔 (秒)，代替原来的固定 sleep
+FETCH_MAX_WORKERS = 6
+PER_HOST_MIN_INTERVAL = 0.2
+
+# 批量翻译配置
+# TRANSLATE_MAX_CHARS: 单次翻译请求的最大字符数 (Google 翻译单次上限为 5000)
+# TRANSLATE_MAX_WORKERS: 同时进行的翻译请求数上限
+# TRANSLATE_TIMEOUT: 单次翻译请求的超时 (秒)，超时计为一次失败 (见熔断器)
+TRANSLATE_MAX_CHARS = 4500
+TRANSLATE_MAX_WORKERS = 4
+TRANSLATE_TIMEOUT = 10
+
+# 用户数据目录
+USER_DATA_DIR = os.path.join(os.path.expanduser("~"), ".news_manager")
+
+# 本地缓存目录 (翻译缓存等)
+CACHE_DIR = os.path.join(USER_DATA_DIR, "cache")
+
+# 新闻存档数据库 (按日期保存抓取过的新闻)
+ARCHIVE_PATH = os.path.join(USER_DATA_DIR, "archive.sqlite3")
+
+# RSS 缓存配置
+# FEED_DEFAULT_TTL: RSS 源的默认缓存有效期 (秒)，可在 COUNTRY_CONFIGS 中用 "ttl" 单独覆盖
+# HTTP_POOL_SIZE: 共享会话的连接池大小
+FEED_DEFAULT_TTL = 600
+HTTP_POOL_SIZE = 10
+
+# 翻译缓存内存层上限 (字节)，超出后按 LRU 淘汰；磁盘层不限
+TRANSLATION_CACHE_MEMORY_BYTES = 8 * 1024 * 1024
+
+# 关键词提取配置
+# JIEBA_USER_DICT: 自定义词典 (jieba 词典格式，文件存在时加载)
+# JIEBA_STOPWORDS: 停用词表 (每行一个词，文件存在时加载)
+# KEYWORD_PROCESSES: 关键词提取进程数，None 表示按 CPU 核数自动决定
+JIEBA_USER_DICT = os.path.join(USER_DATA_DIR, "user_dict.txt")
+JIEBA_STOPWORDS = os.path.join(USER_DATA_DIR, "stopwords.txt")
+KEYWORD_PROCESSES = None
+
+# 词云配置
+# WORDCLOUD_FONT_PATH: 指定中文字体路径，None 表示自动查找
+# WORDCLOUD_RENDER_CACHE_SIZE: 渲染缓存保留的词云数量
+WORDCLOUD_FONT_PATH = None
+WORDCLOUD_RENDER_CACHE_SIZE = 16
+
+# 跨地区重复新闻检测 (MinHash + LSH)
+# DEDUP_NUM_PERM: 签名长度；DEDUP_BANDS: LSH 分段数 (需整除签名长度)
+# DEDUP_THRESHOLD: 估计 Jaccard 相似度达到该值视为同一条新闻
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+DEDUP_THRESHOLD = 0.6
+
+# 后台自适应刷新 (秒)
+# 有新内容时间隔缩短，长时间无变化时间隔拉长，范围在 MIN 与 MAX 之间
+# REFRESH_IDLE_SUSPEND: 系统空闲超过该时长后暂停刷新
+# REFRESH_NOTIFY_THRESHOLD: 一次刷新出现这么多条新新闻时弹出托盘提醒
+REFRESH_TICK_MS = 30 * 1000
+REFRESH_BASE_INTERVAL = 15 * 60
+REFRESH_MIN_INTERVAL = 5 * 60
+REFRESH_MAX_INTERVAL = 2 * 60 * 60
+REFRESH_IDLE_SUSPEND = 15 * 60
+REFRESH_NOTIFY_THRESHOLD = 5
+
+# 导出时间预算与容错
+# EXPORT_DEADLINE: 全球导出的总时间预算 (秒)，到时返回已有结果，未完成的地区用缓存或跳过
+# HEDGE_AFTER: 请求超过该时长仍未返回时再发一次对冲请求 (秒)，0 表示不对冲
+# BREAKER_FAILURE_THRESHOLD: 连续失败多少次后熔断
+# BREAKER_RESET_TIMEOUT: 熔断后多久放行一次试探请求 (秒)
+EXPORT_DEADLINE = 30
+HEDGE_AFTER = 3.0
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 10 * 60
+
+# 导出格式
+# EXPORT_DEFAULT_FORMATS: 默认导出的格式 (可选 txt / md / jsonl / csv / jsonl.gz / jsonl.zst)
+# EXPORT_BUFFER_SIZE: 每个输出文件的写缓冲 (字节)，各格式流式写入，内存占用与导出规模无关
+EXPORT_DEFAULT_FORMATS = ["txt"]
+EXPORT_BUFFER_SIZE = 256 * 1024
+
+# 多日分析的列式存储
+# HEADLINE_STORE_MAX_DAYS: 内存中最多保留多少天的存档切片 (按最近使用淘汰)
+HEADLINE_STORE_MAX_DAYS = 400
+
+# 后台任务调度
+# TASK_MAX_WORKERS: 界面发起的后台任务 (查看日报、词云、导出、刷新等) 同时执行的上限
+TASK_MAX_WORKERS = 4
+
 # 默认保存目录配置键名 (可扩展用于保存用户配置)
 DEFAULT_SAVE_DIR = None
\ No newline at end of file
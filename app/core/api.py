@@ -1,13 +1,30 @@
-import requests
-import xml.etree.ElementTree as ET
-from deep_translator import GoogleTranslator
-from app.config.settings import IP_API_URL
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config.settings import (IP_API_URL, COUNTRY_CONFIGS, TRANSLATE_MAX_CHARS, TRANSLATE_MAX_WORKERS,
+                                 TRANSLATE_TIMEOUT)
+from app.core.cache import get_translation_cache
+from app.core.feed_cache import fetch_feed, fetch_feed_with_status, get_session
+from app.core.language import feed_language, same_language, text_language
+from app.core.parser import parse_news_items
+from app.core.archive import get_archive
+from app.core.resilience import get_breaker, hedged_call
+from app.core.tasks import SingleFlight
+from app.core.tracing import span
+
+# 每个线程复用自己的翻译器实例 (GoogleTranslator 内部持有状态，不跨线程共享)
+_translator_local = threading.local()
+# 批量打包时的分隔符，翻译引擎会原样保留换行
+_BATCH_SEPARATOR = "\n"
+# 翻译服务的熔断器键
+_TRANSLATE_ENDPOINT = "translate:google"
+# 同时进行的相同翻译请求 (例如查看日报和后台刷新同一地区) 只发一次
+_translate_flight = SingleFlight()
 
 
 def fetch_ip_address():
     """获取IP及地理位置"""
     try:
-        response = requests.get(IP_API_URL, timeout=5)
+        response = get_session().get(IP_API_URL, timeout=5)
         if response.status_code == 200:
             data = response.json()
             if data.get("status") == "success":
@@ -27,74 +44,268 @@ def fetch_ip_address():
         return None
 
 
-def translate_text(text, target_lang='zh-CN'):
+class _TimeoutRequests:
+    """deep_translator 调用 requests.get 时不带超时，用这个代理补上默认超时"""
+
+    def __init__(self, requests_module, timeout):
+        self._requests = requests_module
+        self.timeout = timeout
+
+    def get(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self._requests.get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._requests, name)
+
+
+def _get_translator(target_lang, source_lang='auto'):
+    """获取当前线程缓存的翻译器实例"""
+    cache = getattr(_translator_local, "translators", None)
+    if cache is None:
+        cache = _translator_local.translators = {}
+    key = (source_lang, target_lang)
+    if key not in cache:
+        # 延迟导入，加快启动
+        from deep_translator import GoogleTranslator, google
+        if not isinstance(google.requests, _TimeoutRequests):
+            google.requests = _TimeoutRequests(google.requests, TRANSLATE_TIMEOUT)
+        cache[key] = GoogleTranslator(source=source_lang, target=target_lang)
+    return cache[key]
+
+
+def _source_language(text, target_lang, source_lang=None):
+    """
+    翻译时使用的源语言；空文本或源语言与目标语言相同时返回 None (不需要翻译)
+    source_lang: 已知的源语言 (通常来自 RSS 源配置)，未知时在本地检测，检测不出时交给翻译服务 ("auto")
+    """
+    if not text or not text.strip():
+        return None
+    source = text_language(text, source_lang)
+    if same_language(source, target_lang):
+        return None
+    return source or "auto"
+
+
+def translate_text(text, target_lang='zh-CN', source_lang=None):
     """
     通用翻译函数
     target_lang: 'zh-CN' (中文) 或 'en' (英文)
+    source_lang: 原文语言，None 表示在本地检测
     """
-    # 简单优化：如果是中文且目标也是中文，直接返回
-    is_chinese = any('\u4e00' <= ch <= '\u9fff' for ch in text)
-    if target_lang == 'zh-CN' and is_chinese:
+    source = _source_language(text, target_lang, source_lang)
+    if source is None:
         return text
 
-    # 如果目标是英文，且原文看起来像英文(简单判断)，也可以直接返回(视情况而定)
+    cache = get_translation_cache()
+    cached = cache.get(text, target_lang)
+    if cached is not None:
+        return cached
+
+    return _translate_remote(text, target_lang, source)
+
+
+def _translate_remote(text, target_lang, source_lang='auto'):
+    """实际发起单条翻译请求，成功时写入缓存"""
+    return _translate_flight.do(("text", text, source_lang, target_lang),
+                                lambda: _translate_one(text, target_lang, source_lang))
 
+
+def _translate_one(text, target_lang, source_lang):
+    breaker = get_breaker(_TRANSLATE_ENDPOINT)
+    if not breaker.allow():
+        return text
     try:
-        translator = GoogleTranslator(source='auto', target=target_lang)
-        translated = translator.translate(text)
-        return translated
+        # 对冲请求在另一个线程执行，翻译器按线程创建，要在调用线程内获取
+        with span("translate.request", items=1, chars=len(text)):
+            translated = hedged_call(lambda: _get_translator(target_lang, source_lang).translate(text),
+                                     timeout=TRANSLATE_TIMEOUT, pool="translate")
+        breaker.record_success()
+        if translated:
+            get_translation_cache().put(text, target_lang, translated)
+            return translated
+        return text
     except Exception as e:
+        # 超时 (TimeoutError) 同样计为一次失败
         print(f"Translation Error: {e}")
+        breaker.record_failure()
         return text
 
 
+def _pack_chunks(texts, max_chars=TRANSLATE_MAX_CHARS):
+    """把多条文本按字符上限打包成若干块，返回 [[文本, ...], ...]"""
+    chunks, current, size = [], [], 0
+    for text in texts:
+        extra = len(text) + len(_BATCH_SEPARATOR)
+        if current and size + extra > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _translate_chunk(chunk, target_lang, source_lang='auto'):
+    """翻译一个打包块 (块内源语言相同)，行数对不上时退回逐条翻译"""
+    if len(chunk) == 1:
+        return [_translate_remote(chunk[0], target_lang, source_lang)]
+    return _translate_flight.do(("chunk", tuple(chunk), source_lang, target_lang),
+                                lambda: _translate_packed(chunk, target_lang, source_lang))
+
+
+def _translate_packed(chunk, target_lang, source_lang):
+    breaker = get_breaker(_TRANSLATE_ENDPOINT)
+    if not breaker.allow():
+        # 翻译服务已熔断，直接返回原文
+        return list(chunk)
+    try:
+        joined = _BATCH_SEPARATOR.join(chunk)
+        with span("translate.request", items=len(chunk), chars=len(joined)):
+            translated = hedged_call(lambda: _get_translator(target_lang, source_lang).translate(joined),
+                                     timeout=TRANSLATE_TIMEOUT, pool="translate") or ""
+        breaker.record_success()
+        lines = [line.strip() for line in translated.split(_BATCH_SEPARATOR)]
+        if len(lines) == len(chunk):
+            pairs = [(src, line) for src, line in zip(chunk, lines) if line]
+            get_translation_cache().put_many(pairs, target_lang)
+            return [line or src for line, src in zip(lines, chunk)]
+    except Exception as e:
+        print(f"Batch Translation Error: {e}")
+        breaker.record_failure()
+    return [_translate_remote(text, target_lang, source_lang) for text in chunk]
+
+
+def translate_batch(texts, target_lang='zh-CN', max_workers=TRANSLATE_MAX_WORKERS, source_lang=None):
+    """
+    批量翻译
+    按源语言分组，每组按字符上限打包成尽量少的请求 (显式指定源语言，翻译服务不必再检测)，各块并发翻译
+    source_lang: 单个语言代码，或与 texts 一一对应的列表；None 表示逐条在本地检测
+                 与目标语言相同的文本不发请求
+    返回与 texts 一一对应的译文列表
+    """
+    results = list(texts)
+    sources = source_lang if isinstance(source_lang, (list, tuple)) else [source_lang] * len(results)
+    # 只翻译需要翻译的文本，标题内的换行会破坏打包，先替换成空格
+    with span("translate.route", items=len(results)):
+        pending = []
+        for i, (text, hint) in enumerate(zip(results, sources)):
+            source = _source_language(text, target_lang, hint)
+            if source is not None:
+                pending.append((i, " ".join(text.split()), source))
+    if not pending:
+        return results
+
+    # 先查缓存，命中的不再发请求
+    with span("translate.cache", items=len(pending)) as trace:
+        cached = get_translation_cache().get_many(list({text for _, text, _ in pending}), target_lang)
+        trace["hits"] = len(cached)
+    for i, text, _ in pending:
+        if text in cached:
+            results[i] = cached[text]
+    pending = [(i, text, source) for i, text, source in pending if text not in cached]
+    if not pending:
+        return results
+
+    # 同一标题只翻译一次；按源语言分组打包
+    groups = {}
+    for _, text, source in pending:
+        groups.setdefault(source, {})[text] = None
+    chunks = [(source, chunk) for source, group in groups.items() for chunk in _pack_chunks(list(group))]
+    workers = max(1, min(max_workers, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        translated_chunks = list(pool.map(lambda c: _translate_chunk(c[1], target_lang, c[0]), chunks))
+
+    translated = {(source, text): trans for (source, chunk), trans_chunk in zip(chunks, translated_chunks)
+                  for text, trans in zip(chunk, trans_chunk)}
+    for i, text, source in pending:
+        results[i] = translated[(source, text)]
+    return results
+
+
 def fetch_news_titles(rss_url):
     """
     只获取新闻标题，用于词云分析
     """
     titles = []
     try:
-        response = requests.get(rss_url, timeout=10)
-        if response.status_code == 200:
-            root = ET.fromstring(response.content)
+        content = fetch_feed(rss_url)
+        if content:
             # 获取前 20 条以增加词云丰富度
-            for item in root.findall('./channel/item')[:20]:
-                title = item.find('title').text
-                # 去掉来源后缀 (例如 " - CNN")
-                clean_title = title.split(' - ')[0] if title else ""
-                if clean_title:
-                    titles.append(clean_title)
+            titles = [item.title for item in parse_news_items(content, limit=20) if item.title]
     except Exception as e:
         print(f"RSS Fetch Error: {e}")
     return titles
 
 
-def fetch_news_data(rss_url, do_translate=False):
+def region_for_url(rss_url):
+    """根据 RSS 地址反查地区名称"""
+    for name, config in COUNTRY_CONFIGS.items():
+        if config.get("url") == rss_url:
+            return name
+    return rss_url
+
+
+def language_for_url(rss_url):
+    """RSS 源的语言 (见 language.feed_language)，未知时返回 None"""
+    config = COUNTRY_CONFIGS.get(region_for_url(rss_url), {})
+    return feed_language(rss_url, config.get("lang"))
+
+
+def fetch_news_data(rss_url, do_translate=False, archive=True, ttl=None):
     """
     保留原有逻辑，用于日报展示
+    archive: 抓取成功后自动写入当天存档 (批量导出时关闭，改为统一写入)
+    ttl: RSS 缓存有效期，0 表示强制向服务器重新验证
+    """
+    return fetch_news_with_status(rss_url, do_translate, archive, ttl)[0]
+
+
+def fetch_news_with_status(rss_url, do_translate=False, archive=True, ttl=None, timeout=10):
     """
+    同 fetch_news_data，额外返回内容来源 ("fresh" / "live" / "stale" / "failed")
+    timeout: 单次请求超时，导出时按剩余时间预算收紧
+    """
+    status = "failed"
     try:
-        response = requests.get(rss_url, timeout=10)
-        if response.status_code == 200:
-            root = ET.fromstring(response.content)
-            news_items = []
-            for item in root.findall('./channel/item')[:20]:
-                title = item.find('title').text
-                link = item.find('link').text
-                clean_title = title.split(' - ')[0] if title else "无标题"
-                source = title.split(' - ')[-1] if ' - ' in title else "未知"
-
-                final_title = clean_title
-                if do_translate:
-                    # 日报默认翻译成中文
-                    final_title = f"{clean_title} / {translate_text(clean_title, 'zh-CN')}"
-
-                news_items.append({
-                    "title": final_title,
-                    "source": source,
-                    "link": link
-                })
-            return news_items
+        content, status = fetch_feed_with_status(rss_url, ttl=ttl, timeout=timeout)
+        if content:
+            news_items = [{
+                "title": item.title or "无标题",
+                "source": item.source,
+                "link": item.link
+            } for item in parse_news_items(content, limit=20)]
+
+            if do_translate:
+                # 日报默认翻译成中文，整批一次翻译
+                attach_translations(news_items, 'zh-CN', language_for_url(rss_url))
+            # 过期缓存不写存档，避免把旧新闻记到今天
+            if archive and news_items and status != "stale":
+                try:
+                    with span("archive.write", items=len(news_items)):
+                        get_archive().store(region_for_url(rss_url), news_items)
+                except Exception as e:
+                    print(f"Archive Error: {e}")
+            return news_items, status
     except Exception as e:
         print(f"News Fetch Error: {e}")
-    return []
\ No newline at end of file
+    return [], "failed"
+
+
+def attach_translations(news_items, target_lang='zh-CN', source_lang=None):
+    """
+    为新闻列表批量附加译文，标题变为 "原文 / 译文"
+    可以一次传入多个地区的新闻，共享同一批翻译请求
+    source_lang: 原文语言，同 translate_batch
+    """
+    titles = [item["title"] for item in news_items]
+    return apply_translations(news_items, translate_batch(titles, target_lang, source_lang=source_lang))
+
+
+def apply_translations(news_items, translations):
+    """把译文写回新闻列表 (translations 与 news_items 一一对应)"""
+    for item, trans in zip(news_items, translations):
+        item["original"] = item["title"]
+        item["title"] = f"{item['title']} / {trans}"
+    return news_items
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import date as _date
+from app.config.settings import ARCHIVE_PATH
+from app.core.keywords import search_tokens_many
+from app.core.tasks import PRIORITY_LOW, get_task_scheduler
+
+
+def link_hash(link):
+    """链接的短哈希，用作去重键"""
+    return hashlib.sha1((link or "").encode("utf-8")).hexdigest()[:16]
+
+
+def today_str():
+    return _date.today().strftime("%Y-%m-%d")
+
+
+def _index_text(title, original):
+    """建立索引的文本：标题 (可能是 "原文 / 译文") 加上原文"""
+    original = original or ""
+    return title if original in title else f"{title} {original}"
+
+
+def _match_query(tokens):
+    """把查询词拼成 FTS5 查询：所有词都要出现；最后一个英文词按前缀匹配，边输入边能搜到"""
+    tokens = list(dict.fromkeys(tokens))
+    terms = ['"' + token.replace('"', '""') + '"' for token in tokens]
+    if tokens and tokens[-1].isascii():
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class HeadlineArchive:
+    """
+    本地新闻存档 (SQLite)
+    按 (日期, 地区, 链接哈希) 唯一，同一天重复抓取时更新已有的条目，新条目追加，旧条目保留
+    全文索引 (FTS5)：写入后在后台增量建立，删除时由触发器同步删除
+    FTS5 不会给中文分词，所以索引里存的是预先分好、用空格连接的词
+    """
+
+    def __init__(self, db_path=ARCHIVE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # INSERT OR REPLACE 替换旧行时也要触发删除索引
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS headlines ("
+            " id INTEGER PRIMARY KEY,"
+            " date TEXT NOT NULL,"
+            " region TEXT NOT NULL,"
+            " link_hash TEXT NOT NULL,"
+            " rank INTEGER NOT NULL,"
+            " title TEXT NOT NULL,"
+            " original TEXT NOT NULL,"
+            " source TEXT,"
+            " link TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " UNIQUE (date, region, link_hash));"
+            "CREATE INDEX IF NOT EXISTS idx_headlines_date_region ON headlines (date, region, rank);"
+            "CREATE INDEX IF NOT EXISTS idx_headlines_link_hash ON headlines (link_hash);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS headlines_fts USING fts5 (tokens);"
+            "CREATE TRIGGER IF NOT EXISTS headlines_fts_delete AFTER DELETE ON headlines BEGIN"
+            " DELETE FROM headlines_fts WHERE rowid = old.id;"
+            " END;"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _rows(date_str, region, news_items, now):
+        for rank, item in enumerate(news_items):
+            yield (date_str, region, link_hash(item.get("link")), rank,
+                   item["title"], item.get("original", item["title"]),
+                   item.get("source"), item.get("link"), now)
+
+    def store_many(self, regions, date_str=None):
+        """
+        批量写入，所有地区在同一个事务中完成
+        regions: [(地区名称, 新闻列表), ...]
+        写入后在后台增量更新全文索引，分词不阻塞抓取流程
+        """
+        date_str = date_str or today_str()
+        now = time.time()
+        with self._lock, self._conn:
+            for region, news_items in regions:
+                if not news_items:
+                    continue
+                # 当天较早抓到、这次已不在列表中的新闻保留；再次出现的按 (日期, 地区, 链接) 替换，排名和抓取时间取最新一次
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO headlines "
+                    "(date, region, link_hash, rank, title, original, source, link, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._rows(date_str, region, news_items, now)
+                )
+        get_task_scheduler().submit(self.index_missing, key=("search-index", self.db_path), priority=PRIORITY_LOW)
+
+    def store(self, region, news_items, date_str=None):
+        self.store_many([(region, news_items)], date_str)
+
+    def load(self, region, date_str):
+        """
+        读取某地区某天的存档，格式与 fetch_news_data 返回值一致
+        当天抓取过多次时，最近一次抓到的在前，按排名排序
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, original, source, link FROM headlines "
+                "WHERE date = ? AND region = ? ORDER BY fetched_at DESC, rank",
+                (date_str, region)
+            ).fetchall()
+        return [{"title": title, "original": original, "source": source, "link": link}
+                for title, original, source, link in rows]
+
+    def load_latest(self, region, date_str=None):
+        """
+        读取某地区最近一次的存档 (不晚于 date_str)，用于先显示旧内容再刷新
+        返回 (日期, 新闻列表, 抓取时间戳)；没有存档时返回 (None, [], None)
+        """
+        date_str = date_str or today_str()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT date, MAX(fetched_at) FROM headlines WHERE region = ? AND date <= ? "
+                "GROUP BY date ORDER BY date DESC LIMIT 1",
+                (region, date_str)
+            ).fetchone()
+        if row is None:
+            return None, [], None
+        return row[0], self.load(region, row[0]), row[1]
+
+    def search(self, query, limit=50, region=None):
+        """
+        全文搜索所有日期、地区的存档
+        返回 [{"date", "region", "title", "original", "source", "link", "score"}, ...]，按相关度排序
+        """
+        # 刚写入、后台还没来得及索引的行先补上
+        self.index_missing()
+        tokens = search_tokens_many([query])[0]
+        if not tokens:
+            return []
+        # 先在索引内按相关度取前 limit 条，再关联存档表 (避免对所有命中行做关联)
+        match = _match_query(tokens)
+        if region:
+            sql = ("SELECT h.date, h.region, h.title, h.original, h.source, h.link, f.rank "
+                   "FROM headlines_fts f JOIN headlines h ON h.id = f.rowid "
+                   "WHERE f.tokens MATCH ? AND h.region = ? ORDER BY f.rank LIMIT ?")
+            params = (match, region, limit)
+        else:
+            sql = ("SELECT h.date, h.region, h.title, h.original, h.source, h.link, f.rank "
+                   "FROM (SELECT rowid, rank FROM headlines_fts WHERE headlines_fts MATCH ? ORDER BY rank LIMIT ?) f "
+                   "JOIN headlines h ON h.id = f.rowid ORDER BY f.rank")
+            params = (match, limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"date": date_str, "region": region_name, "title": title, "original": original,
+                 "source": source, "link": link, "score": -score}
+                for date_str, region_name, title, original, source, link, score in rows]
+
+    def index_missing(self, batch_size=2000):
+        """
+        为还没有索引的存档建立索引，返回新建的条数
+        新行的 id 总是大于已有的行，而删除的行会由触发器移出索引，
+        所以只需索引 id 大于索引中最大 rowid 的行 (旧版本写入的存档也会一并补上)
+        """
+        total = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, title, original FROM headlines "
+                    "WHERE id > IFNULL((SELECT rowid FROM headlines_fts ORDER BY rowid DESC LIMIT 1), 0) "
+                    "ORDER BY id LIMIT ?",
+                    (batch_size,)
+                ).fetchall()
+            if not rows:
+                return total
+            tokens = search_tokens_many((_index_text(title, original) for _, title, original in rows), fallback=False)
+            # 分词进程池不可用时，只索引第一条没能分词的行之前的部分，其余留到下次再建
+            # (索引按 rowid 递增推进，跳过的行以后不会再补)
+            indexed = next((i for i, words in enumerate(tokens) if words is None), len(rows))
+            if indexed:
+                with self._lock, self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO headlines_fts (rowid, tokens) VALUES (?, ?)",
+                        [(row[0], " ".join(words)) for row, words in zip(rows[:indexed], tokens)]
+                    )
+            total += indexed
+            if indexed < len(rows):
+                return total
+
+    def day_versions(self, start_date, end_date):
+        """
+        日期范围内每天的 {日期: (条数, 最近抓取时间)}
+        内存中的按天切片 (见 headline_store) 据此判断是否需要重新读取
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, COUNT(*), MAX(fetched_at) FROM headlines "
+                "WHERE date BETWEEN ? AND ? GROUP BY date ORDER BY date",
+                (start_date, end_date)
+            ).fetchall()
+        return {date_str: (count, fetched_at) for date_str, count, fetched_at in rows}
+
+    def load_day_rows(self, date_str):
+        """某天的全部存档行 [(id, 地区, 来源, 排名, 抓取时间, 标题, 原文), ...]，供列式存储按天载入"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, region, source, rank, fetched_at, title, original FROM headlines "
+                "WHERE date = ? ORDER BY region, rank",
+                (date_str,)
+            ).fetchall()
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """获取全局存档 (首次使用时创建)"""
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = HeadlineArchive()
+    return _archive
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from app.config.settings import CACHE_DIR, TRANSLATION_CACHE_MEMORY_BYTES
+
+
+def normalize_text(text):
+    """缓存键的文本归一化：合并空白字符"""
+    return " ".join(text.split()) if text else ""
+
+
+class TranslationCache:
+    """
+    两级翻译缓存
+    1. 内存 LRU：按文本字节数估算占用，超出上限时淘汰最久未用的条目
+    2. 磁盘 SQLite：程序重启后仍然有效
+    键为 (归一化文本, 目标语言)
+    """
+
+    def __init__(self, db_path=None, max_bytes=TRANSLATION_CACHE_MEMORY_BYTES):
+        self.db_path = db_path or os.path.join(CACHE_DIR, "translations.sqlite3")
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " text TEXT NOT NULL,"
+            " target_lang TEXT NOT NULL,"
+            " translated TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (text, target_lang))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _entry_size(key, value):
+        return len(key[0].encode("utf-8")) + len(value.encode("utf-8")) + len(key[1])
+
+    def _remember(self, key, value):
+        """写入内存层 (调用方需持有锁)"""
+        if key in self._memory:
+            self._memory_bytes -= self._entry_size(key, self._memory.pop(key))
+        self._memory[key] = value
+        self._memory_bytes += self._entry_size(key, value)
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            old_key, old_value = self._memory.popitem(last=False)
+            self._memory_bytes -= self._entry_size(old_key, old_value)
+
+    def get_many(self, texts, target_lang):
+        """批量查询，返回 {原文: 译文}，只包含命中的条目"""
+        found = {}
+        with self._lock:
+            missing = []
+            for text in texts:
+                key = (normalize_text(text), target_lang)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[text] = self._memory[key]
+                else:
+                    missing.append(text)
+
+            if missing:
+                keys = {normalize_text(text): text for text in missing}
+                names = list(keys)
+                # SQLite 单条语句的参数个数有限，分批查询
+                for start in range(0, len(names), 500):
+                    part = names[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    rows = self._conn.execute(
+                        f"SELECT text, translated FROM translations "
+                        f"WHERE target_lang = ? AND text IN ({placeholders})",
+                        [target_lang] + part
+                    ).fetchall()
+                    for norm, translated in rows:
+                        self._remember((norm, target_lang), translated)
+                        found[keys[norm]] = translated
+
+            hits = sum(1 for text in texts if text in found)
+            self.hits += hits
+            self.misses += len(texts) - hits
+        return found
+
+    def get(self, text, target_lang):
+        return self.get_many([text], target_lang).get(text)
+
+    def put_many(self, pairs, target_lang):
+        """批量写入 [(原文, 译文), ...]，两级同时更新，磁盘层一次事务"""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, translated in pairs:
+                key = (normalize_text(text), target_lang)
+                self._remember(key, translated)
+                rows.append((key[0], target_lang, translated, now))
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO translations (text, target_lang, translated, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+
+    def put(self, text, target_lang, translated):
+        self.put_many([(text, translated)], target_lang)
+
+    def stats(self):
+        """返回命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+
+_translation_cache = None
+_translation_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """获取全局翻译缓存 (首次使用时创建)"""
+    global _translation_cache
+    if _translation_cache is None:
+        with _translation_cache_lock:
+            if _translation_cache is None:
+                _translation_cache = TranslationCache()
+    return _translation_cache
@@ -0,0 +1,118 @@
+import re
+import zlib
+import numpy as np
+from app.config.settings import DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_THRESHOLD
+
+# 固定种子的哈希参数，保证不同进程、不同运行之间签名一致
+# 取 2^31-1，保证 a * h + b 在 uint64 范围内不溢出
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=DEDUP_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=DEDUP_NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def shingles(text, k=3):
+    """字符 k-gram (去掉标点和空白、统一小写)，中英文通用"""
+    normalized = _NON_WORD.sub("", (text or "").lower())
+    if len(normalized) <= k:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+
+def minhash_signature(text):
+    """计算 MinHash 签名 (长度 DEDUP_NUM_PERM 的 uint64 数组)，所有排列一次向量化完成"""
+    grams = shingles(text)
+    if not grams:
+        return np.full(DEDUP_NUM_PERM, _MERSENNE_PRIME, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    # (a * h + b) mod p，形状为 (排列数, shingle 数)，再按行取最小值
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def estimate_jaccard(sig_a, sig_b):
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class MinHashLSH:
+    """
+    LSH 索引：签名分成若干段，任意一段完全相同即为候选
+    插入和查询只访问对应的桶，与已索引条目数量无关
+    """
+
+    def __init__(self, bands=DEDUP_BANDS, threshold=DEDUP_THRESHOLD):
+        if DEDUP_NUM_PERM % bands:
+            raise ValueError("DEDUP_NUM_PERM 必须能被 bands 整除")
+        self.bands = bands
+        self.rows = DEDUP_NUM_PERM // bands
+        self.threshold = threshold
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def insert(self, key, signature):
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, signature):
+        """返回估计相似度达到阈值的已有条目，按相似度降序 [(key, 相似度), ...]"""
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        scored = [(key, estimate_jaccard(signature, self._signatures[key])) for key in candidates]
+        return sorted([item for item in scored if item[1] >= self.threshold], key=lambda x: -x[1])
+
+    def __len__(self):
+        return len(self._signatures)
+
+
+class HeadlineDeduplicator:
+    """
+    跨地区近似重复标题聚类
+    按到达顺序处理，每个簇的第一条作为代表，之后的近似标题只记录所属地区
+    """
+
+    def __init__(self, bands=DEDUP_BANDS, threshold=DEDUP_THRESHOLD):
+        self.index = MinHashLSH(bands, threshold)
+        self.clusters = []  # [{"title", "region", "rank", "regions": [...]}]
+
+    def add(self, region, rank, title):
+        """
+        加入一条标题
+        返回 None 表示新簇；否则返回已有簇的代表 (簇字典)
+        """
+        signature = minhash_signature(title)
+        matches = self.index.query(signature)
+        if matches:
+            cluster = self.clusters[matches[0][0]]
+            if region not in cluster["regions"]:
+                cluster["regions"].append(region)
+            return cluster
+
+        self.index.insert(len(self.clusters), signature)
+        self.clusters.append({"title": title, "region": region, "rank": rank, "regions": [region]})
+        return None
+
+    def add_region(self, region, news_items):
+        """
+        处理一个地区的新闻列表
+        重复条目会加上 "dup_of" 字段 (例如 "美国 (US) #3")，返回其中的新条目列表
+        """
+        fresh = []
+        for rank, item in enumerate(news_items, 1):
+            cluster = self.add(region, rank, item.get("original", item["title"]))
+            if cluster is None:
+                fresh.append(item)
+            else:
+                item["dup_of"] = f"{cluster['region']} #{cluster['rank']}"
+        return fresh
+
+    def shared_clusters(self):
+        """出现在多个地区的簇"""
+        return [cluster for cluster in self.clusters if len(cluster["regions"]) > 1]
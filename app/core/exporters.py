@@ -0,0 +1,258 @@
+import csv
+import gzip
+import io
+import json
+import os
+from importlib.util import find_spec
+from app.config.settings import EXPORT_BUFFER_SIZE
+
+# 全球日报的导出格式
+# 抓取流程只走一遍，每个地区完成后依次交给各格式的写入器，写入器不保留已写出的内容
+
+
+# 地区内容来源的标记 (正常抓取的不标记)
+REGION_STATUS_LABELS = {
+    "stale": "缓存",
+    "skipped": "超时跳过",
+    "failed": "获取失败",
+    "untranslated": "未翻译",
+}
+
+# JSONL / CSV 中每条新闻的字段
+RECORD_FIELDS = ["date", "region", "status", "rank", "title", "original", "source", "link", "dup_of"]
+# 复用同一个编码器，省去每条记录重新解析参数
+_json_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def status_label(status):
+    return REGION_STATUS_LABELS.get(status, "")
+
+
+def _records(date_str, name, news_list, status):
+    for rank, item in enumerate(news_list, 1):
+        yield {
+            "date": date_str,
+            "region": name,
+            "status": status or "",
+            "rank": rank,
+            "title": item["title"],
+            "original": item.get("original", item["title"]),
+            "source": item.get("source") or "",
+            "link": item.get("link") or "",
+            "dup_of": item.get("dup_of") or "",
+        }
+
+
+class ExportWriter:
+    """
+    单个格式的写入器：先写入 <路径>.part，commit 时原子重命名，abort 时删除
+    子类实现 write_header / write_region / write_clusters
+    """
+    extension = ""
+    encoding = "utf-8"
+
+    def __init__(self, path, date_str):
+        self.path = path
+        self.date_str = date_str
+        self.tmp_path = path + ".part"
+        self.f = self.open(self.tmp_path)
+
+    def open(self, path):
+        return open(path, "w", encoding=self.encoding, newline="", buffering=EXPORT_BUFFER_SIZE)
+
+    def write_header(self, header):
+        pass
+
+    def write_region(self, name, news_list, status):
+        raise NotImplementedError
+
+    def write_clusters(self, clusters):
+        pass
+
+    def commit(self):
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        try:
+            self.f.close()
+        except Exception as e:
+            print(f"Export Close Error: {e}")
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+class TextWriter(ExportWriter):
+    """纯文本 (原有的日报格式)"""
+    extension = "txt"
+
+    def write_header(self, header):
+        self.f.write(header)
+
+    def write_region(self, name, news_list, status):
+        write = self.f.write
+        label = status_label(status)
+        write(f"\n## 🌍 {name}" + (f" [{label}]" if label else "") + "\n")
+        if not news_list:
+            write("   (获取失败)\n")
+        for i, item in enumerate(news_list, 1):
+            if item.get("dup_of"):
+                # 跨地区重复的新闻只在第一次出现时完整列出
+                write(f"{i}. ↳ {item['title']}\n   [同]: {item['dup_of']}\n")
+            else:
+                write(f"{i}. {item['title']}\n   [链接]: {item['link']}\n")
+
+    def write_clusters(self, clusters):
+        write = self.f.write
+        write("\n## 🔁 跨地区重复新闻\n")
+        for cluster in clusters:
+            write(f"- {cluster['title']}\n   [地区]: {', '.join(cluster['regions'])}\n")
+
+
+def _md_text(text):
+    """链接文字中的方括号会打断 Markdown 链接"""
+    return (text or "").replace("[", "\\[").replace("]", "\\]")
+
+
+class MarkdownWriter(ExportWriter):
+    """Markdown：标题行作为一级标题，每条新闻是带链接的列表项"""
+    extension = "md"
+
+    def write_header(self, header):
+        lines = [line.strip() for line in header.splitlines() if line.strip("=").strip()]
+        if not lines:
+            return
+        self.f.write(f"# {lines[0].strip('【】')}\n\n")
+        for line in lines[1:]:
+            self.f.write(f"- {line}\n")
+
+    def write_region(self, name, news_list, status):
+        write = self.f.write
+        label = status_label(status)
+        write(f"\n## 🌍 {name}" + (f" ({label})" if label else "") + "\n\n")
+        if not news_list:
+            write("*(获取失败)*\n")
+        for i, item in enumerate(news_list, 1):
+            if item.get("dup_of"):
+                write(f"{i}. ↳ {_md_text(item['title'])} — 同: {_md_text(item['dup_of'])}\n")
+            else:
+                source = f" — {_md_text(item['source'])}" if item.get("source") else ""
+                write(f"{i}. [{_md_text(item['title'])}]({item.get('link') or ''}){source}\n")
+
+    def write_clusters(self, clusters):
+        write = self.f.write
+        write("\n## 🔁 跨地区重复新闻\n\n")
+        for cluster in clusters:
+            write(f"- {_md_text(cluster['title'])} — {', '.join(cluster['regions'])}\n")
+
+
+class JsonlWriter(ExportWriter):
+    """
+    JSON Lines：每条新闻一行 ({"type": "item", ...RECORD_FIELDS})
+    跨地区重复新闻汇总为 {"type": "cluster", "title", "link", "regions"}
+    """
+    extension = "jsonl"
+
+    def write_line(self, record):
+        self.f.write(_json_encoder.encode(record))
+        self.f.write("\n")
+
+    def write_region(self, name, news_list, status):
+        for record in _records(self.date_str, name, news_list, status):
+            record["type"] = "item"
+            self.write_line(record)
+
+    def write_clusters(self, clusters):
+        for cluster in clusters:
+            self.write_line({"type": "cluster", "date": self.date_str, "title": cluster["title"],
+                             "link": cluster.get("link") or "", "regions": cluster["regions"]})
+
+
+class GzipJsonlWriter(JsonlWriter):
+    extension = "jsonl.gz"
+
+    def open(self, path):
+        raw = gzip.GzipFile(path, "wb", compresslevel=6)
+        return io.TextIOWrapper(io.BufferedWriter(raw, EXPORT_BUFFER_SIZE), encoding=self.encoding, newline="")
+
+
+class ZstdJsonlWriter(JsonlWriter):
+    """需要安装可选依赖 zstandard"""
+    extension = "jsonl.zst"
+
+    def open(self, path):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("导出 .jsonl.zst 需要先安装 zstandard (pip install zstandard)")
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+        return io.TextIOWrapper(io.BufferedWriter(raw, EXPORT_BUFFER_SIZE), encoding=self.encoding, newline="")
+
+
+class CsvWriter(ExportWriter):
+    """CSV：每条新闻一行，带 BOM 方便 Excel 直接打开中文"""
+    extension = "csv"
+    encoding = "utf-8-sig"
+
+    def __init__(self, path, date_str):
+        super().__init__(path, date_str)
+        self.writer = csv.DictWriter(self.f, fieldnames=RECORD_FIELDS)
+        self.writer.writeheader()
+
+    def write_region(self, name, news_list, status):
+        self.writer.writerows(_records(self.date_str, name, news_list, status))
+
+
+EXPORT_FORMATS = {writer.extension: writer for writer in
+                  (TextWriter, MarkdownWriter, JsonlWriter, CsvWriter, GzipJsonlWriter, ZstdJsonlWriter)}
+
+
+def available_formats():
+    """当前环境可用的导出格式 (未安装 zstandard 时不含 jsonl.zst)"""
+    return [name for name in EXPORT_FORMATS if name != "jsonl.zst" or find_spec("zstandard") is not None]
+
+
+class ExportSet:
+    """
+    同时写入多个格式：base_path + "." + 扩展名
+    任何一个格式出错时整体放弃，不留下不完整的文件
+    """
+
+    def __init__(self, base_path, formats, date_str):
+        formats = list(dict.fromkeys(formats))
+        unknown = [name for name in formats if name not in EXPORT_FORMATS]
+        if unknown or not formats:
+            raise ValueError(f"未知的导出格式: {', '.join(unknown) or '(空)'}")
+        self.writers = []
+        try:
+            for name in formats:
+                self.writers.append(EXPORT_FORMATS[name](f"{base_path}.{name}", date_str))
+        except Exception:
+            self.abort()
+            raise
+
+    @property
+    def paths(self):
+        return [writer.path for writer in self.writers]
+
+    def write_header(self, header):
+        for writer in self.writers:
+            writer.write_header(header)
+
+    def write_region(self, name, news_list, status):
+        for writer in self.writers:
+            writer.write_region(name, news_list, status)
+
+    def write_clusters(self, clusters):
+        for writer in self.writers:
+            writer.write_clusters(clusters)
+
+    def commit(self):
+        return [writer.commit() for writer in self.writers]
+
+    def abort(self):
+        for writer in self.writers:
+            writer.abort()
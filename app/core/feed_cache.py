@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from app.config.settings import (CACHE_DIR, COUNTRY_CONFIGS, FEED_DEFAULT_TTL,
+                                 HTTP_POOL_SIZE, FETCH_MAX_WORKERS)
+from app.core.fetcher import HostRateLimiter
+from app.core.resilience import get_breaker, hedged_call
+from app.core.tasks import SingleFlight
+from app.core.tracing import span
+
+# 只有真正发出的网络请求才需要按主机限速，命中本地缓存时不等待
+_host_limiter = HostRateLimiter()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    全局共享的 HTTP 会话
+    复用 TCP/TLS 连接 (keep-alive)，连接池大小与并发抓取数匹配
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # requests 延迟导入，加快启动
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                      pool_maxsize=max(HTTP_POOL_SIZE, FETCH_MAX_WORKERS))
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"User-Agent": "NewsManager/0.1"})
+                _session = session
+    return _session
+
+
+def get_feed_ttl(url):
+    """读取某个 RSS 源的缓存有效期，配置里没有写 "ttl" 时使用默认值"""
+    for config in COUNTRY_CONFIGS.values():
+        if config.get("url") == url:
+            return config.get("ttl", FEED_DEFAULT_TTL)
+    return FEED_DEFAULT_TTL
+
+
+class FeedCache:
+    """
+    RSS 响应的磁盘缓存
+    每个 URL 对应两个文件：正文 (.xml) 和元数据 (.json，含 ETag / Last-Modified / 抓取时间)
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "feeds")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # 同一 URL 同时只发一次请求，其余调用方共享结果
+        self._flight = SingleFlight()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".xml", base + ".json"
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        """读取缓存，返回 (正文, 元数据)，不存在时返回 (None, {})"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return f.read(), meta
+        except (OSError, ValueError):
+            return None, {}
+
+    def load_meta(self, url):
+        """只读取元数据 (不读正文)，不存在时返回 {}"""
+        _, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def store(self, url, body, meta):
+        body_path, meta_path = self._paths(url)
+        with self._lock:
+            if body is not None:
+                self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def fetch(self, url, ttl=None, timeout=10):
+        """获取 RSS 正文 (bytes)，失败且没有缓存时返回 None"""
+        return self.fetch_with_status(url, ttl, timeout)[0]
+
+    def fetch_with_status(self, url, ttl=None, timeout=10):
+        """
+        获取 RSS 正文，返回 (正文, 来源)
+        1. 缓存未过期：直接返回本地内容，来源 "fresh"
+        2. 已过期：带 If-None-Match / If-Modified-Since 重新验证 (慢时发对冲请求)，
+           200 / 304 时来源 "live"
+        3. 网络失败或该源已熔断：有旧缓存就返回旧缓存 (来源 "stale")，否则返回 (None, "failed")
+        """
+        ttl = get_feed_ttl(url) if ttl is None else ttl
+        with span("rss.download", url=url) as trace:
+            body, status = self._flight.do(url, lambda: self._fetch(url, ttl, timeout, trace))
+            trace.setdefault("status", "coalesced")
+            trace["bytes"] = len(body) if body else 0
+            trace["source"] = status
+            return body, status
+
+    def _fetch(self, url, ttl, timeout, trace):
+        body, meta = self.load(url)
+        now = time.time()
+        fallback = (body, "stale") if body is not None else (None, "failed")
+
+        if body is not None and now - meta.get("fetched_at", 0) < ttl:
+            trace["status"] = "cache"
+            return body, "fresh"
+
+        breaker = get_breaker(f"feed:{url}")
+        if not breaker.allow():
+            trace["status"] = "circuit-open"
+            return fallback
+
+        headers = {}
+        if body is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        _host_limiter.wait(url)
+        session = get_session()
+        try:
+            response = hedged_call(lambda: session.get(url, headers=headers, timeout=timeout),
+                                   timeout=timeout, pool="feed")
+        except Exception as e:
+            print(f"Feed Fetch Error: {e}")
+            trace["status"] = "error"
+            breaker.record_failure()
+            return fallback
+
+        trace["status"] = response.status_code
+        if response.status_code == 304 and body is not None:
+            breaker.record_success()
+            meta["fetched_at"] = now
+            self.store(url, None, meta)
+            return body, "live"
+
+        if response.status_code == 200:
+            breaker.record_success()
+            new_meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": now,
+            }
+            self.store(url, response.content, new_meta)
+            return response.content, "live"
+
+        print(f"Feed Fetch Error: HTTP {response.status_code} for {url}")
+        breaker.record_failure()
+        return fallback
+
+
+_feed_cache = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_feed_cache():
+    """获取全局 RSS 缓存 (首次使用时创建)"""
+    global _feed_cache
+    if _feed_cache is None:
+        with _feed_cache_lock:
+            if _feed_cache is None:
+                _feed_cache = FeedCache()
+    return _feed_cache
+
+
+def fetch_feed(url, ttl=None, timeout=10):
+    """统一的 RSS 获取入口，所有抓取都应经过这里"""
+    return get_feed_cache().fetch(url, ttl=ttl, timeout=timeout)
+
+
+def fetch_feed_with_status(url, ttl=None, timeout=10):
+    """同 fetch_feed，额外返回内容来源 ("fresh" / "live" / "stale" / "failed")"""
+    return get_feed_cache().fetch_with_status(url, ttl=ttl, timeout=timeout)
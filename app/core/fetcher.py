@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from urllib.parse import urlparse
+from app.config.settings import FETCH_MAX_WORKERS, PER_HOST_MIN_INTERVAL
+
+
+class HostRateLimiter:
+    """
+    按主机限速器
+    同一主机的两次请求之间至少间隔 min_interval 秒，不同主机互不影响
+    """
+
+    def __init__(self, min_interval=PER_HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}  # host -> 下一次允许请求的时间点
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        # 在锁外睡眠，其他主机的请求不用排队
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def fetch_regions(configs, fetch_func, on_done=None, on_ready=None, keep_results=True,
+                  max_workers=FETCH_MAX_WORKERS, limiter=None, deadline=None, on_timeout=None):
+    """
+    并发抓取多个地区
+    configs: {名称: 配置} 字典 (如 COUNTRY_CONFIGS)
+    fetch_func: fetch_func(name, config) -> 结果
+    on_done: 每个地区完成时回调 on_done(name, result, done_count, total)
+    on_ready: 按配置顺序依次回调 on_ready(name, result)，前面的地区都完成后才会轮到后面的
+    keep_results: 为 False 时不保留结果 (流式处理时配合 on_ready 使用)，返回 None
+    limiter: 可选的额外限速器；经 fetch_feed 的网络请求已由共享限速器按主机限速
+    deadline: 截止时间 (time.monotonic() 的绝对值)，到时不再等待未完成的地区
+    on_timeout: 超时地区的替代结果 on_timeout(name, config)，默认为 None；
+                超时地区同样会经过 on_done / on_ready
+    返回: [(名称, 结果), ...]，顺序与 configs 一致
+    """
+    names = list(configs.keys())
+    results = {}
+    pending = {}  # 已完成但还没轮到 on_ready 的结果
+    next_index = 0
+    done_count = 0
+    total = len(names)
+
+    def task(name):
+        config = configs[name]
+        if limiter:
+            limiter.wait(config["url"])
+        try:
+            return fetch_func(name, config)
+        except Exception as e:
+            print(f"Region Fetch Error ({name}): {e}")
+            return None
+
+    def handle(name, result):
+        nonlocal next_index, done_count
+        done_count += 1
+        if keep_results:
+            results[name] = result
+        if on_done:
+            on_done(name, result, done_count, total)
+        if on_ready:
+            pending[name] = result
+            while next_index < total and names[next_index] in pending:
+                ready_name = names[next_index]
+                on_ready(ready_name, pending.pop(ready_name))
+                next_index += 1
+
+    if total == 0:
+        return [] if keep_results else None
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, total)))
+    try:
+        futures = {pool.submit(task, name): name for name in names}
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            for future in as_completed(list(futures), timeout=timeout):
+                handle(futures.pop(future), future.result())
+        except FuturesTimeoutError:
+            # 到达截止时间：未完成的地区按配置顺序使用替代结果
+            for name in [n for n in names if n in futures.values()]:
+                handle(name, on_timeout(name, configs[name]) if on_timeout else None)
+    finally:
+        # 有截止时间时不等待落后的线程 (它们会在后台结束)
+        pool.shutdown(wait=deadline is None, cancel_futures=True)
+
+    if not keep_results:
+        return None
+    return [(name, results[name]) for name in names]
@@ -0,0 +1,298 @@
+import threading
+from collections import OrderedDict
+from datetime import date as _date
+import numpy as np
+from app.config.settings import HEADLINE_STORE_MAX_DAYS
+from app.core.archive import get_archive
+from app.core.tracing import span
+
+# 多日、全地区分析用的列式内存存储
+# 每条新闻不再是一个 dict：地区、来源、词都映射成整数编号，数值列用 numpy 数组，
+# 文本列拼成一整块 UTF-8 字节加偏移量；按天从存档懒加载，存档有变化时才重新读取
+
+
+class StringPool:
+    """字符串驻留：相同的字符串只保存一份，对外用整数编号"""
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def encode(self, values, dtype=np.int32):
+        code = self.code
+        return np.fromiter((code(value) for value in values), dtype=dtype, count=len(values))
+
+    def lookup(self, name):
+        """已有字符串的编号，不存在时返回 -1 (不会新增)"""
+        return self._codes.get(name, -1)
+
+
+class TextColumn:
+    """文本列：所有字符串拼成一块 UTF-8 字节，offsets[i]:offsets[i+1] 是第 i 条"""
+
+    def __init__(self, data=b"", offsets=None):
+        self.data = data
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [(s or "").encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    @classmethod
+    def concat(cls, columns):
+        columns = list(columns)
+        if len(columns) == 1:
+            return columns[0]
+        shift = np.cumsum([0] + [len(column.data) for column in columns[:-1]])
+        offsets = np.concatenate([np.zeros(1, dtype=np.int64)] +
+                                 [column.offsets[1:] + s for column, s in zip(columns, shift)])
+        return cls(b"".join(column.data for column in columns), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        data, offsets = self.data, self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode("utf-8")
+
+    def take(self, rows):
+        """按行号取子集 (直接拼接字节片段，不解码)"""
+        starts, ends = self.offsets[rows], self.offsets[rows + 1]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(ends - starts, out=offsets[1:])
+        data = self.data
+        return TextColumn(b"".join(data[s:e] for s, e in zip(starts.tolist(), ends.tolist())), offsets)
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.offsets.nbytes
+
+
+def _take_ragged(indices, indptr, rows):
+    """按行号取 CSR 形式的变长列表 (indices, indptr)，全部为数组运算"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    new_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_indptr[1:])
+    positions = np.repeat(starts - new_indptr[:-1], lengths) + np.arange(new_indptr[-1])
+    return indices[positions], new_indptr
+
+
+def translated_part(title, original):
+    """存档标题是 "原文 / 译文" (见 api.apply_translations)，取出译文；没有译文时返回标题本身"""
+    prefix = original + " / "
+    return title[len(prefix):] if original and title.startswith(prefix) else title
+
+
+class HeadlineFrame:
+    """
+    一段存档的列式视图
+    数值列：ids (存档行号)、day (日期序数)、fetched_at、region / source (编号，见 HeadlineStore 的字符串池)、rank
+    文本列：title、original
+    tokens: {语言: (词编号数组, 行偏移数组)}，按需计算
+    """
+    NUMERIC = ("ids", "day", "fetched_at", "region", "source", "rank")
+
+    def __init__(self, ids, day, fetched_at, region, source, rank, title, original, tokens=None):
+        self.ids = ids
+        self.day = day
+        self.fetched_at = fetched_at
+        self.region = region
+        self.source = source
+        self.rank = rank
+        self.title = title
+        self.original = original
+        self.tokens = tokens or {}
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, np.int64), np.zeros(0, np.int32), np.zeros(0, np.float64),
+                   np.zeros(0, np.int16), np.zeros(0, np.int32), np.zeros(0, np.int16),
+                   TextColumn(), TextColumn())
+
+    @classmethod
+    def concat(cls, frames):
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return cls.empty()
+        if len(frames) == 1:
+            return frames[0]
+        columns = {name: np.concatenate([getattr(frame, name) for frame in frames]) for name in cls.NUMERIC}
+        tokens = {}
+        # 只合并所有切片都已分词的语言
+        for lang in set.intersection(*(set(frame.tokens) for frame in frames)):
+            parts = [frame.tokens[lang] for frame in frames]
+            shift = np.cumsum([0] + [indptr[-1] for _, indptr in parts[:-1]])
+            indptr = np.concatenate([np.zeros(1, dtype=np.int64)] +
+                                    [indptr[1:] + s for (_, indptr), s in zip(parts, shift)])
+            tokens[lang] = (np.concatenate([indices for indices, _ in parts]), indptr)
+        return cls(title=TextColumn.concat(frame.title for frame in frames),
+                   original=TextColumn.concat(frame.original for frame in frames),
+                   tokens=tokens, **columns)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def select(self, rows):
+        """按布尔掩码或行号取子集"""
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        columns = {name: getattr(self, name)[rows] for name in self.NUMERIC}
+        tokens = {lang: _take_ragged(indices, indptr, rows) for lang, (indices, indptr) in self.tokens.items()}
+        return HeadlineFrame(title=self.title.take(rows), original=self.original.take(rows),
+                             tokens=tokens, **columns)
+
+    def texts(self, lang):
+        """分析用的文本：中文取译文部分，其他语言取原文"""
+        if lang == "zh-CN":
+            return [translated_part(title, original) for title, original in zip(self.title, self.original)]
+        return list(self.original)
+
+    def doc_term(self, lang, term_names):
+        """
+        文档-词矩阵 (CSR，行=标题，列=本段出现过的词)
+        term_names: 词编号对应的词 (HeadlineStore.terms.names)
+        返回 (矩阵, 列对应的词列表)
+        """
+        from scipy import sparse
+
+        # 空切片 (窗口内没有存档) 不会分词，按空矩阵处理
+        empty = (np.zeros(0, dtype=np.int32), np.zeros(len(self) + 1, dtype=np.int64))
+        indices, indptr = self.tokens.get(lang, empty)
+        used, columns = np.unique(indices, return_inverse=True)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), columns.astype(np.int64), indptr),
+            shape=(len(self), len(used))
+        )
+        matrix.sum_duplicates()
+        return matrix, [term_names[i] for i in used]
+
+    @property
+    def nbytes(self):
+        total = sum(getattr(self, name).nbytes for name in self.NUMERIC)
+        total += self.title.nbytes + self.original.nbytes
+        total += sum(indices.nbytes + indptr.nbytes for indices, indptr in self.tokens.values())
+        return total
+
+
+class HeadlineStore:
+    """
+    多日存档的列式缓存
+    按天加载 (window 只读取范围内还没加载或已变化的日期)，最多保留 max_days 天，按最近使用淘汰
+    地区、来源、词在所有切片之间共享同一套编号，切片可以直接拼接
+    """
+
+    def __init__(self, archive=None, max_days=HEADLINE_STORE_MAX_DAYS):
+        self.archive = archive
+        self.max_days = max_days
+        self.regions = StringPool()
+        self.sources = StringPool()
+        self.terms = StringPool()
+        self._days = OrderedDict()  # 日期 -> (版本, HeadlineFrame)
+        self._lock = threading.Lock()
+
+    def _load_day(self, archive, date_str):
+        rows = archive.load_day_rows(date_str)
+        if not rows:
+            return HeadlineFrame.empty()
+        ids, regions, sources, ranks, fetched_at, titles, originals = zip(*rows)
+        n = len(rows)
+        return HeadlineFrame(
+            ids=np.fromiter(ids, dtype=np.int64, count=n),
+            day=np.full(n, _date.fromisoformat(date_str).toordinal(), dtype=np.int32),
+            fetched_at=np.fromiter(fetched_at, dtype=np.float64, count=n),
+            region=self.regions.encode(regions, np.int16),
+            source=self.sources.encode([source or "" for source in sources]),
+            rank=np.fromiter(ranks, dtype=np.int16, count=n),
+            title=TextColumn.from_strings(titles),
+            original=TextColumn.from_strings(originals),
+        )
+
+    def _tokenize(self, frames, lang):
+        """给还没分词的切片分词，所有切片合并成一批交给分词进程池"""
+        from app.core.keywords import tokenize_many
+
+        frames = [frame for frame in frames if lang not in frame.tokens]
+        if not frames:
+            return
+        texts = [text for frame in frames for text in frame.texts(lang)]
+        with span("keywords.tokenize", items=len(texts)):
+            token_lists = tokenize_many(texts)
+        start = 0
+        code = self.terms.code
+        for frame in frames:
+            lists = token_lists[start:start + len(frame)]
+            start += len(frame)
+            indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+            np.cumsum([len(tokens) for tokens in lists], out=indptr[1:])
+            indices = np.fromiter((code(token) for tokens in lists for token in tokens),
+                                  dtype=np.int32, count=int(indptr[-1]))
+            frame.tokens[lang] = (indices, indptr)
+
+    def window(self, start_date, end_date, regions=None, tokens=None):
+        """
+        取 [start_date, end_date] 的存档 (含两端，格式 YYYY-MM-DD)，返回 HeadlineFrame
+        regions: 只保留这些地区；tokens: 同时准备该语言的分词结果 (供 doc_term 使用)
+        """
+        archive = self.archive or get_archive()
+        versions = archive.day_versions(start_date, end_date)
+        with self._lock:
+            frames = []
+            for date_str, version in versions.items():
+                cached = self._days.get(date_str)
+                if cached is None or cached[0] != version:
+                    # 当天的存档有新写入 (条数或最近抓取时间变化)，重新读取这一天
+                    with span("store.load", items=version[0]):
+                        cached = self._days[date_str] = (version, self._load_day(archive, date_str))
+                self._days.move_to_end(date_str)
+                frames.append(cached[1])
+            if tokens:
+                self._tokenize(frames, tokens)
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+        frame = HeadlineFrame.concat(frames)
+        if regions:
+            codes = [self.regions.lookup(name) for name in regions]
+            frame = frame.select(np.isin(frame.region, codes))
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(frame.nbytes for _, frame in self._days.values())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_headline_store():
+    """获取全局列式存储 (首次使用时创建)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HeadlineStore()
+    return _store
@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from app.config.settings import CACHE_DIR, JIEBA_USER_DICT, JIEBA_STOPWORDS, KEYWORD_PROCESSES
+
+# 注意：本模块会在子进程中被导入，不能依赖 PyQt6
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _init_jieba(cache_dir=CACHE_DIR, user_dict=JIEBA_USER_DICT, stopwords=JIEBA_STOPWORDS):
+    """
+    子进程初始化：每个进程只加载一次词典
+    jieba 会把前缀词典序列化到 cache_file，之后的进程直接反序列化，不再重建
+    路径由主进程传入：子进程重新导入的配置模块看不到主进程运行时改写的值
+    """
+    import jieba
+    import jieba.analyse
+
+    os.makedirs(cache_dir, exist_ok=True)
+    jieba.dt.cache_file = os.path.join(cache_dir, "jieba.cache")
+    jieba.initialize()
+
+    if user_dict and os.path.exists(user_dict):
+        jieba.load_userdict(user_dict)
+    if stopwords and os.path.exists(stopwords):
+        jieba.analyse.set_stop_words(stopwords)
+
+
+def extract_keywords(text, top_k=20):
+    """
+    提取关键词 (在子进程中执行)
+    返回 [(词, 权重), ...]
+    """
+    import jieba.analyse
+    return jieba.analyse.extract_tags(text, topK=top_k, withWeight=True)
+
+
+def tokenize(text):
+    """
+    分词 (在子进程中执行)
+    去掉停用词、标点、纯数字和单字，英文统一小写
+    """
+    import jieba
+    import jieba.analyse
+
+    stop_words = jieba.analyse.default_tfidf.stop_words
+    tokens = []
+    for word in jieba.lcut(text):
+        word = word.strip().lower()
+        if len(word) < 2 or word.isdigit() or word in stop_words:
+            continue
+        if not any(ch.isalnum() for ch in word):
+            continue
+        tokens.append(word)
+    return tokens
+
+
+def tokenize_many(texts, chunk_size=64):
+    """批量分词，多进程并行，返回与 texts 对应的词列表"""
+    texts = list(texts)
+    if not texts:
+        return []
+    return list(get_keyword_pool().map(tokenize, texts, chunksize=chunk_size))
+
+
+# 中日文 (汉字、假名) 需要 jieba 分词，其余语言按空格和标点切词即可
+_CJK_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]")
+_WORD_RE = re.compile(r"\w+")
+
+
+def word_tokens(text):
+    """非中日文的简单分词：按单词切分，统一小写"""
+    return _WORD_RE.findall(text.lower())
+
+
+def search_tokens(text):
+    """
+    建立搜索索引用的分词 (在子进程中执行)
+    中日文用 jieba 搜索引擎模式 (长词再切出短词，提高召回)，保留单字；只去掉标点
+    """
+    if not _CJK_RE.search(text):
+        return word_tokens(text)
+    import jieba
+
+    tokens = []
+    for word in jieba.cut_for_search(text):
+        word = word.strip().lower()
+        if word and any(ch.isalnum() for ch in word):
+            tokens.append(word)
+    return tokens
+
+
+def search_tokens_many(texts, chunk_size=64, fallback=True):
+    """
+    批量分词 (搜索索引用)，返回与 texts 对应的词列表
+    只有含中日文的文本交给进程池，其余在当前线程直接切词
+    fallback: 进程池不可用时中日文按单词粗切 (查询用)；为 False 时这些文本返回 None，
+              由调用方稍后重试 (建索引用，粗切的结果写进索引后不会再更新)
+    """
+    texts = list(texts)
+    results = [None if _CJK_RE.search(text) else word_tokens(text) for text in texts]
+    cjk = [i for i, tokens in enumerate(results) if tokens is None]
+    if cjk:
+        try:
+            tokenized = get_keyword_pool().map(search_tokens, [texts[i] for i in cjk], chunksize=chunk_size)
+            for i, tokens in zip(cjk, tokenized):
+                results[i] = tokens
+        except Exception as e:
+            print(f"Search Tokenize Error: {e}")
+            if fallback:
+                # 退化为按单词切分 (中文按整句)
+                for i in cjk:
+                    results[i] = word_tokens(texts[i])
+    return results
+
+
+def get_keyword_pool():
+    """获取常驻的关键词提取进程池 (首次使用时创建)"""
+    global _pool, _pool_size
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool_size = KEYWORD_PROCESSES or max(1, min(4, (os.cpu_count() or 2) - 1))
+                # 用 spawn 启动子进程：fork 会复制主进程中正在运行的线程和锁 (Qt、翻译线程池等)
+                _pool = ProcessPoolExecutor(max_workers=_pool_size, initializer=_init_jieba,
+                                            initargs=(CACHE_DIR, JIEBA_USER_DICT, JIEBA_STOPWORDS),
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def submit_keywords(text, top_k=20):
+    """异步提取关键词，返回 Future"""
+    return get_keyword_pool().submit(extract_keywords, text, top_k)
+
+
+def warm_keyword_pool():
+    """预先启动进程池并加载词典"""
+    pool = get_keyword_pool()
+    futures = [pool.submit(extract_keywords, "预热", 1) for _ in range(_pool_size)]
+    for future in futures:
+        future.result()
@@ -0,0 +1,96 @@
+import re
+from urllib.parse import parse_qs, urlparse
+
+# 语言代码与本地语言检测
+# 统一使用 Google 翻译的代码：中文区分 zh-CN / zh-TW，其余只取主标签 (en-US -> en, pt-BR -> pt)
+
+_CHINESE_VARIANTS = {"zh": "zh-CN", "zh-cn": "zh-CN", "zh-sg": "zh-CN", "zh-hans": "zh-CN",
+                     "zh-tw": "zh-TW", "zh-hk": "zh-TW", "zh-mo": "zh-TW", "zh-hant": "zh-TW"}
+# Google 翻译沿用旧代码的语言
+_LEGACY_CODES = {"he": "iw", "jv": "jw"}
+
+# 各文字系统的字符范围
+_SCRIPTS = {
+    "kana": re.compile(r"[\u3040-\u30ff]"),
+    "hangul": re.compile(r"[\uac00-\ud7af\u1100-\u11ff]"),
+    "han": re.compile(r"[\u4e00-\u9fff]"),
+    "cyrillic": re.compile(r"[\u0400-\u04ff]"),
+    "greek": re.compile(r"[\u0370-\u03ff]"),
+    "arabic": re.compile(r"[\u0600-\u06ff]"),
+    "hebrew": re.compile(r"[\u0590-\u05ff]"),
+    "devanagari": re.compile(r"[\u0900-\u097f]"),
+    "thai": re.compile(r"[\u0e00-\u0e7f]"),
+    "latin": re.compile(r"[A-Za-z\u00c0-\u024f]"),
+}
+# 按顺序检查：日文标题常夹带汉字，假名要先于汉字判断
+_SCRIPT_LANGS = [("kana", "ja"), ("hangul", "ko"), ("han", "zh-CN"), ("cyrillic", "ru"), ("greek", "el"),
+                 ("arabic", "ar"), ("hebrew", "iw"), ("devanagari", "hi"), ("thai", "th")]
+# 各语言使用的文字系统 (未列出的按拉丁字母处理)
+_LANG_SCRIPTS = {"zh-CN": ("han",), "zh-TW": ("han",), "ja": ("kana", "han"), "ko": ("hangul", "han"),
+                 "ru": ("cyrillic",), "uk": ("cyrillic",), "bg": ("cyrillic",), "el": ("greek",),
+                 "ar": ("arabic",), "iw": ("hebrew",), "hi": ("devanagari",), "th": ("thai",)}
+
+# 拉丁字母语言靠常见虚词区分
+_STOPWORDS = {
+    "en": {"the", "of", "and", "to", "in", "is", "for", "on", "with", "as", "at", "by", "after", "from", "says"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "mit", "auf", "für", "von", "den", "im", "ein", "eine"},
+    "fr": {"le", "la", "les", "des", "et", "est", "une", "du", "pour", "dans", "sur", "au", "aux", "avec"},
+    "es": {"el", "los", "las", "del", "y", "que", "en", "por", "una", "con", "para", "se", "al"},
+    "pt": {"o", "os", "as", "do", "da", "dos", "das", "e", "que", "em", "um", "uma", "com", "para", "no", "na"},
+    "it": {"il", "lo", "gli", "della", "di", "che", "è", "per", "con", "una", "nel", "alla", "dei"},
+}
+_WORD_RE = re.compile(r"[a-z\u00e0-\u00ff]+")
+
+
+def normalize_lang(code):
+    """统一语言代码；空值和 "auto" 返回 None"""
+    if not code or code == "auto":
+        return None
+    code = code.strip().replace("_", "-").lower()
+    if code.startswith("zh"):
+        return _CHINESE_VARIANTS.get(code, "zh-CN")
+    primary = code.split("-")[0]
+    return _LEGACY_CODES.get(primary, primary)
+
+
+def same_language(a, b):
+    a, b = normalize_lang(a), normalize_lang(b)
+    return a is not None and a == b
+
+
+def feed_language(url, lang=None):
+    """RSS 源的语言：优先用配置里的 lang，其次取 Google News 地址中的 hl= 参数，都没有时返回 None"""
+    if lang:
+        return normalize_lang(lang)
+    values = parse_qs(urlparse(url or "").query).get("hl")
+    return normalize_lang(values[0]) if values else None
+
+
+def detect_language(text):
+    """
+    本地快速检测 (不联网)：先按文字系统判断，拉丁字母再按常见虚词判断
+    无法确定时返回 None，由翻译服务自动检测
+    """
+    for script, lang in _SCRIPT_LANGS:
+        if _SCRIPTS[script].search(text):
+            return lang
+    words = _WORD_RE.findall(text.lower())
+    scores = sorted(((sum(word in stopwords for word in words), lang) for lang, stopwords in _STOPWORDS.items()),
+                    reverse=True)
+    # 标题很短，至少命中两个虚词且明显领先时才采用，否则交给翻译服务 (猜错源语言会翻错)
+    (best_score, best), (second_score, _) = scores[0], scores[1]
+    if best_score >= 2 and best_score > second_score:
+        return best
+    return None
+
+
+def text_language(text, hint=None):
+    """
+    单条文本的语言
+    hint 为源的语言：文本用的是该语言的文字时直接采用；
+    文字对不上时 (例如英文源里的印地语标题) 以本地检测为准
+    """
+    hint = normalize_lang(hint)
+    if hint and any(_SCRIPTS[script].search(text) for script in _LANG_SCRIPTS.get(hint, ("latin",))):
+        return hint
+    return detect_language(text) or hint
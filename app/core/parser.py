@@ -0,0 +1,83 @@
+import io
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from app.core.tracing import span
+
+
+class NewsItem(NamedTuple):
+    """一条 RSS 新闻"""
+    title: str  # 去掉来源后缀的标题，可能为空
+    source: str  # 来源 (例如 "CNN")，未知时为 "未知"
+    link: Optional[str]
+    pub_date: Optional[str]
+
+
+def split_title(raw_title):
+    """
+    拆分 Google News 标题
+    "标题 - 来源" -> ("标题", "来源")
+    """
+    if not raw_title:
+        return "", "未知"
+    clean_title = raw_title.split(' - ')[0]
+    source = raw_title.split(' - ')[-1] if ' - ' in raw_title else "未知"
+    return clean_title, source
+
+
+def iter_news_items(content, limit=20):
+    """
+    流式解析 RSS，逐条产出 NewsItem
+    不构建完整 DOM：每处理完一个 <item> 就释放它，取够 limit 条后立即停止读取
+    """
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    path = []  # 当前元素的祖先 (从根开始)
+    for event, elem in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+        if event == "start":
+            path.append(elem)
+            continue
+        path.pop()
+        if elem.tag != "item":
+            continue
+
+        clean_title, source = split_title(elem.findtext("title"))
+        yield NewsItem(clean_title, source, elem.findtext("link"), elem.findtext("pubDate"))
+
+        # 释放已处理的节点，避免整棵树常驻内存
+        # 从实际的父节点移除 (RSS 2.0 在 <channel> 内，RSS 1.0/RDF 与 <channel> 同级)
+        elem.clear()
+        if path:
+            path[-1].remove(elem)
+        count += 1
+        if limit is not None and count >= limit:
+            break
+
+
+_parsed_cache = OrderedDict()
+_parsed_cache_lock = threading.Lock()
+_PARSED_CACHE_SIZE = 32
+
+
+def parse_news_items(content, limit=20):
+    """
+    解析 RSS 并缓存结果
+    同一份正文 (例如日报和词云先后读取同一个源) 只解析一次
+    """
+    key = (hash(content), len(content), limit)
+    with _parsed_cache_lock:
+        if key in _parsed_cache:
+            _parsed_cache.move_to_end(key)
+            return _parsed_cache[key]
+
+    with span("rss.parse", bytes=len(content)) as trace:
+        items = list(iter_news_items(content, limit))
+        trace["items"] = len(items)
+
+    with _parsed_cache_lock:
+        _parsed_cache[key] = items
+        while len(_parsed_cache) > _PARSED_CACHE_SIZE:
+            _parsed_cache.popitem(last=False)
+    return items
@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from app.config.settings import (CACHE_DIR, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT,
+                                 HEDGE_AFTER)
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    连续失败 failure_threshold 次后打开，打开期间直接跳过；
+    reset_timeout 秒后进入半开状态，放行一次试探请求，成功则关闭，失败则重新打开
+    """
+
+    def __init__(self, key, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT,
+                 failures=0, opened_at=None):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = failures
+        self.opened_at = opened_at
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """是否允许发出请求"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            changed = self.opened_at is not None or self.failures
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+        if changed:
+            _registry.save()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            opened = self.failures >= self.failure_threshold
+            if opened:
+                self.opened_at = time.time()
+        if opened:
+            print(f"Circuit Open: {self.key} (连续失败 {self.failures} 次)")
+            _registry.save()
+
+
+class BreakerRegistry:
+    """按键管理熔断器，状态保存在磁盘上，程序重启 (或命令行再次运行) 后依然有效"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, "breakers.json")
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for key, state in json.load(f).items():
+                    self._breakers[key] = CircuitBreaker(key, failures=state.get("failures", 0),
+                                                         opened_at=state.get("opened_at"))
+        except (OSError, ValueError):
+            pass
+        self._loaded = True
+
+    def get(self, key):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(key)
+            return self._breakers[key]
+
+    def save(self):
+        with self._lock:
+            data = {key: {"failures": b.failures, "opened_at": b.opened_at}
+                    for key, b in self._breakers.items() if b.failures or b.opened_at}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Breaker Save Error: {e}")
+
+
+_registry = BreakerRegistry()
+
+
+def get_breaker(key):
+    return _registry.get(key)
+
+
+# 对冲请求使用的线程池，按用途分开 (落后的请求会在后台继续跑完，不阻塞调用方)
+# 卡住的翻译请求只会占满翻译自己的池，不影响抓取 RSS
+_hedge_pools = {}
+_hedge_pools_lock = threading.Lock()
+
+
+def _get_hedge_pool(name):
+    with _hedge_pools_lock:
+        pool = _hedge_pools.get(name)
+        if pool is None:
+            pool = _hedge_pools[name] = ThreadPoolExecutor(max_workers=16, thread_name_prefix=f"hedge-{name}")
+        return pool
+
+
+def hedged_call(func, hedge_after=HEDGE_AFTER, timeout=None, pool="default"):
+    """
+    对冲请求
+    先发一次请求，hedge_after 秒内没有返回就再发一次，取先成功的结果；
+    两次都失败时抛出最后一个异常，超过 timeout 抛出 TimeoutError
+    timeout 不大于 hedge_after 时不对冲 (对冲请求发出时已经超时)
+    pool: 使用的线程池名称 (例如 "feed"、"translate")
+    """
+    hedge = hedge_after and hedge_after > 0 and (timeout is None or hedge_after < timeout)
+    if not hedge and timeout is None:
+        return func()
+    executor = _get_hedge_pool(pool)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    futures = {executor.submit(func)}
+    if hedge:
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            futures.add(executor.submit(func))
+
+    last_error = None
+    while futures:
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, futures = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+        if not done:
+            raise TimeoutError("hedged call timed out")
+        for future in done:
+            try:
+                return future.result()
+            except Exception as e:
+                last_error = e
+    raise last_error
@@ -0,0 +1,106 @@
+import sys
+import time
+from app.config.settings import (REFRESH_BASE_INTERVAL, REFRESH_MIN_INTERVAL, REFRESH_MAX_INTERVAL,
+                                 REFRESH_IDLE_SUSPEND, REFRESH_NOTIFY_THRESHOLD)
+
+
+class FeedState:
+    """单个 RSS 源的刷新状态"""
+
+    def __init__(self, name, url, interval=REFRESH_BASE_INTERVAL):
+        self.name = name
+        self.url = url
+        self.interval = interval
+        self.next_due = 0.0  # 启动后第一次检查立即刷新
+        self.links = None  # 上一次看到的链接集合
+        self.failures = 0
+
+
+class AdaptiveRefreshScheduler:
+    """
+    自适应刷新调度 (不依赖 Qt，由界面层的定时器驱动)
+    有新内容：间隔减半 (不低于最小值)；没有变化：间隔乘 1.5 (不超过最大值)；失败：指数退避
+    """
+
+    def __init__(self, configs, min_interval=REFRESH_MIN_INTERVAL, max_interval=REFRESH_MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.feeds = {name: FeedState(name, config["url"]) for name, config in configs.items()}
+
+    def due_feeds(self, now=None):
+        """返回到期需要刷新的源"""
+        now = time.time() if now is None else now
+        return [feed for feed in self.feeds.values() if feed.next_due <= now]
+
+    def record(self, name, links, now=None):
+        """
+        记录一次刷新结果
+        links: 本次抓到的链接列表，None 表示抓取失败
+        返回新出现的链接数 (第一次刷新和失败时为 0)
+        """
+        now = time.time() if now is None else now
+        feed = self.feeds[name]
+
+        if links is None:
+            feed.failures += 1
+            feed.next_due = now + min(self.max_interval, feed.interval * (2 ** feed.failures))
+            return 0
+
+        feed.failures = 0
+        current = set(links)
+        new_count = 0 if feed.links is None else len(current - feed.links)
+        if feed.links is not None:
+            if new_count:
+                feed.interval = max(self.min_interval, feed.interval / 2)
+            else:
+                feed.interval = min(self.max_interval, feed.interval * 1.5)
+        feed.links = current
+        feed.next_due = now + feed.interval
+        return new_count
+
+    @staticmethod
+    def is_major(new_count):
+        return new_count >= REFRESH_NOTIFY_THRESHOLD
+
+
+def system_idle_seconds():
+    """系统空闲时间 (秒)，无法检测时返回 None (目前只支持 Windows)"""
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+        info = LASTINPUTINFO()
+        info.cbSize = ctypes.sizeof(info)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        millis = ctypes.windll.kernel32.GetTickCount() - info.dwTime
+        return millis / 1000.0
+    except Exception:
+        return None
+
+
+def on_battery():
+    """是否在使用电池供电，无法检测时返回 None (需要可选依赖 psutil)"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        battery = psutil.sensors_battery()
+    except Exception:
+        return None
+    if battery is None:
+        return None
+    return not battery.power_plugged
+
+
+def should_suspend():
+    """空闲过久或使用电池时暂停后台刷新"""
+    idle = system_idle_seconds()
+    if idle is not None and idle > REFRESH_IDLE_SUSPEND:
+        return True
+    return bool(on_battery())
@@ -0,0 +1,272 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from app.config.settings import COUNTRY_CONFIGS, FETCH_MAX_WORKERS, EXPORT_DEADLINE, EXPORT_DEFAULT_FORMATS
+from app.core.api import fetch_news_with_status, translate_batch, apply_translations
+from app.core.archive import get_archive, today_str
+from app.core.cache import get_translation_cache
+from app.core.exporters import ExportSet
+from app.core.feed_cache import get_feed_cache
+from app.core.fetcher import fetch_regions
+from app.core.language import feed_language
+from app.core.parser import parse_news_items
+from app.core.tracing import span
+
+# 不依赖 PyQt6 的核心业务流程，GUI 线程和命令行共用
+
+
+def freshness_text(fetched_at, now=None):
+    """缓存内容的新鲜度说明，例如：12 分钟前 (09:41)"""
+    if not fetched_at:
+        return "未知"
+    now = now or time.time()
+    age = max(0, int(now - fetched_at))
+    clock = time.strftime("%m-%d %H:%M" if age >= 86400 else "%H:%M", time.localtime(fetched_at))
+    if age < 60:
+        return f"刚刚 ({clock})"
+    if age < 3600:
+        return f"{age // 60} 分钟前 ({clock})"
+    if age < 86400:
+        return f"{age // 3600} 小时前 ({clock})"
+    return f"{age // 86400} 天前 ({clock})"
+
+
+def new_links(old_list, new_list):
+    """刷新后新出现的条目 (按链接比较)"""
+    seen = {item.get("link") for item in old_list}
+    return {item.get("link") for item in new_list if item.get("link") not in seen}
+
+
+def build_export_header(date_str, location_text=""):
+    """导出文件头部"""
+    return f"【全球重点新闻汇总】\n日期: {date_str}\n{location_text}\n" + ("=" * 50)
+
+
+def _stale_region(config):
+    """超时地区：尽量用本地缓存的旧内容代替"""
+    body, _ = get_feed_cache().load(config["url"])
+    if not body:
+        return [], "skipped"
+    try:
+        items = [{"title": item.title or "无标题", "source": item.source, "link": item.link}
+                 for item in parse_news_items(body, limit=20)]
+    except Exception as e:
+        print(f"Stale Parse Error: {e}")
+        return [], "skipped"
+    return items, "stale" if items else "skipped"
+
+
+def _translate_duplicates(news_list, representatives, target_lang='zh-CN'):
+    """
+    存档用的新闻列表：跨地区重复的条目没有单独翻译，
+    先查翻译缓存，没有时借用所属簇代表条目的译文 (不修改导出用的原列表)
+    representatives: {"地区 #排名": 代表条目}
+    """
+    pending = [item for item in news_list if item.get("dup_of") and "original" not in item]
+    if not pending:
+        return news_list
+    cached = get_translation_cache().get_many([item["title"] for item in pending], target_lang)
+    result = []
+    for item in news_list:
+        if item.get("dup_of") and "original" not in item:
+            trans = cached.get(item["title"])
+            rep = representatives.get(item["dup_of"])
+            if trans is None and rep and "original" in rep:
+                # 代表条目的标题是 "原文 / 译文" (见 api.apply_translations)
+                trans = rep["title"][len(rep["original"]) + 3:]
+            if trans:
+                item = dict(item, title=f"{item['title']} / {trans}", original=item["title"])
+        result.append(item)
+    return result
+
+
+def export_global_report(base_path, header, date_str=None, configs=COUNTRY_CONFIGS,
+                         on_progress=None, on_region=None, on_dedup=None, deadline=EXPORT_DEADLINE,
+                         formats=EXPORT_DEFAULT_FORMATS):
+    """
+    导出全球日报
+    1. 并发抓取各地区 (过去的日期直接读本地存档)
+    2. 按配置顺序做跨地区去重 (MinHash/LSH)，重复的新闻不再翻译
+    3. 各地区的新条目并发翻译，完成后按顺序回调 on_region 并交给各格式的写入器
+    4. 全部完成后写入重复新闻汇总，各临时文件原子重命名为目标文件
+    base_path: 不带扩展名的目标路径，每个格式写入 base_path + "." + 格式 (见 exporters.EXPORT_FORMATS)
+    deadline: 总时间预算 (秒)，None 表示不限；到时尽力返回：
+              未抓到的地区用缓存或跳过，未翻译完的地区输出原文，并在标题上标明
+    回调：on_progress(消息, 百分比)、on_region(地区名称, 新闻列表, 来源)、on_dedup(重复簇列表)
+    返回写入的文件路径列表；出错时抛出异常，不会留下不完整的目标文件
+    """
+    from app.core.dedup import HeadlineDeduplicator  # 依赖 numpy，延迟导入
+
+    date_str = date_str or today_str()
+    from_archive = date_str < today_str()
+    end_time = None if deadline is None else time.monotonic() + deadline
+    dedup = HeadlineDeduplicator()
+    waiting = deque()  # [(地区名称, 新闻列表, 来源, 待翻译条目, 翻译 Future)]，按配置顺序等待输出
+    representatives = {}  # {"地区 #排名": 簇的代表条目}，存档时给重复条目补译文
+    archived = []  # [(地区名称, 新闻列表)]，全部输出后在一个事务中写入存档
+    # 抓取完成 (主线程) 和翻译完成 (翻译线程) 都会触发输出，同一时间只有一个线程在输出
+    flush_lock = threading.Lock()
+    flush_requested = False
+    flush_errors = []  # 翻译线程中输出出错时记下，由主线程抛出
+
+    def remaining():
+        return None if end_time is None else max(0.0, end_time - time.monotonic())
+
+    def fetch_region(name, config):
+        if from_archive:
+            news_list = get_archive().load(name, date_str)
+            return news_list, "fresh" if news_list else "failed"
+        # 单次请求的超时不超过剩余预算
+        left = remaining()
+        timeout = 10 if left is None else max(1.0, min(10.0, left))
+        return fetch_news_with_status(config["url"], archive=False, timeout=timeout)
+
+    def on_done(name, result, done_count, total):
+        if on_progress:
+            percent = int((done_count / total) * 100)
+            on_progress(f"已完成: {name} ({done_count}/{total})", percent)
+
+    def write_region(name, news_list, status):
+        with span("export.write", items=len(news_list)):
+            writers.write_region(name, news_list, status)
+        if news_list and not from_archive and status not in ("stale", "skipped"):
+            archived.append((name, _translate_duplicates(news_list, representatives)))
+        if on_region:
+            on_region(name, news_list, status)
+
+    def flush(block=False):
+        while waiting:
+            name, news_list, status, fresh, future = waiting[0]
+            if future is not None and not block and not future.done():
+                return
+            waiting.popleft()
+            if future is not None:
+                try:
+                    apply_translations(fresh, future.result(timeout=remaining()))
+                except FuturesTimeoutError:
+                    # 超出时间预算：输出原文
+                    if status in ("live", "fresh"):
+                        status = "untranslated"
+                except Exception as e:
+                    print(f"Translation Error ({name}): {e}")
+            write_region(name, news_list, status)
+
+    def request_flush():
+        """
+        输出已就绪的地区，不阻塞：其他线程正在输出时只做标记，由它释放锁前再检查一遍
+        """
+        nonlocal flush_requested
+        flush_requested = True
+        while flush_requested and flush_lock.acquire(blocking=False):
+            try:
+                flush_requested = False
+                if not flush_errors:
+                    flush()
+            except Exception as e:
+                flush_errors.append(e)
+            finally:
+                flush_lock.release()
+
+    def on_ready(name, result):
+        news_list, status = result if result else ([], "failed")
+        # 去重必须按配置顺序进行，保证每个簇的代表条目稳定
+        with span("dedup", items=len(news_list)):
+            fresh = dedup.add_region(name, news_list)
+        for rank, item in enumerate(news_list, 1):
+            if "dup_of" not in item:
+                representatives[f"{name} #{rank}"] = item
+        # 存档里的标题已经翻译过
+        future = None
+        if fresh and not from_archive:
+            config = configs.get(name, {})
+            future = translate_pool.submit(translate_batch, [item["title"] for item in fresh], 'zh-CN',
+                                           source_lang=feed_language(config.get("url"), config.get("lang")))
+        waiting.append((name, news_list, status, fresh, future))
+        if future is not None:
+            # 翻译完成时立即输出，不必等下一个地区抓取完成
+            future.add_done_callback(lambda _future: request_flush())
+        request_flush()
+        if flush_errors:
+            raise flush_errors[0]
+
+    writers = ExportSet(base_path, formats, date_str)
+    translate_pool = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS)
+    try:
+        writers.write_header(header)
+        # 并发抓取 (不翻译)，按配置顺序流式输出，不保留全部结果
+        fetch_regions(configs, fetch_region, on_done=on_done, on_ready=on_ready, keep_results=False,
+                      deadline=end_time, on_timeout=lambda name, config: _stale_region(config))
+        with flush_lock:
+            if flush_errors:
+                raise flush_errors[0]
+            flush(block=True)
+        if archived:
+            try:
+                with span("archive.write", items=sum(len(news_list) for _, news_list in archived)):
+                    get_archive().store_many(archived, date_str)
+            except Exception as e:
+                print(f"Archive Error: {e}")
+
+        shared = dedup.shared_clusters()
+        if shared:
+            writers.write_clusters(shared)
+            if on_dedup:
+                on_dedup(shared)
+
+        with span("export.commit", items=len(writers.writers)) as trace:
+            paths = writers.commit()
+            trace["bytes"] = sum(os.path.getsize(path) for path in paths)
+    except Exception:
+        writers.abort()
+        raise
+    finally:
+        # 出错时剩下的地区不再输出；不等待超时未完成的翻译
+        with flush_lock:
+            waiting.clear()
+        translate_pool.shutdown(wait=False, cancel_futures=True)
+
+    stats = get_translation_cache().stats()
+    # 写到 stderr，不和命令行输出的文件路径混在一起
+    print(f"Translation Cache: hits={stats['hits']} misses={stats['misses']}", file=sys.stderr)
+    return paths
+
+
+def keyword_report(rss_url, target_lang='zh-CN', top_k=20):
+    """
+    单个地区的热词 (不生成图片)
+    返回 (关键词列表 [(词, 权重), ...], 报告文本)；抓取失败时返回 (None, 错误信息)
+    """
+    from app.core.api import fetch_news_titles, language_for_url, translate_batch
+    from app.core.keywords import submit_keywords
+
+    raw_titles = fetch_news_titles(rss_url)
+    if not raw_titles:
+        return None, "获取RSS失败"
+    # 如果需要中文词云，就翻译成中文；英文同理
+    full_text = " ".join(translate_batch(raw_titles, target_lang, source_lang=language_for_url(rss_url)))
+    with span("keywords.jieba", bytes=len(full_text.encode("utf-8"))) as trace:
+        keywords_list = submit_keywords(full_text, top_k=top_k).result()
+        trace["items"] = len(keywords_list)
+    keywords_str = f"【今日热词 Top {top_k}】\n"
+    for word, weight in keywords_list:
+        keywords_str += f"- {word} (权重: {weight:.2f})\n"
+    return keywords_list, keywords_str
+
+
+def history_keyword_report(region, days, target_lang='zh-CN', top_k=20):
+    """
+    某地区近 days 天的热词 (来自本地存档的列式存储，不联网)
+    返回格式同 keyword_report；没有存档时返回 (None, 错误信息)
+    """
+    from app.core.trending import history_keywords
+
+    keywords_list = history_keywords(region, days, target_lang, top_k=top_k)
+    if not keywords_list:
+        return None, f"没有 {region} 近 {days} 天的本地存档"
+    keywords_str = f"【近 {days} 天热词 Top {top_k}】\n"
+    for word, weight in keywords_list:
+        keywords_str += f"- {word} (权重: {weight:.3f})\n"
+    return keywords_list, keywords_str
@@ -0,0 +1,83 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    启动阶段计时器
+    未启用时所有方法都是空操作，不影响正常启动
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.records = []  # [(阶段名称, 开始偏移秒, 耗时秒, 线程名)]
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.records.append((name, start - self._origin, end - start,
+                                     threading.current_thread().name))
+
+    def mark(self, name):
+        """记录一个时间点 (耗时为 0)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.records.append((name, time.perf_counter() - self._origin, 0.0,
+                                 threading.current_thread().name))
+
+    def report(self, title="启动耗时"):
+        if not self.enabled:
+            return
+        with self._lock:
+            records = sorted(self.records, key=lambda r: r[1])
+        print(f"===== {title} =====")
+        for name, offset, duration, thread_name in records:
+            print(f"[{offset * 1000:8.1f} ms] {name:<32} {duration * 1000:8.1f} ms  ({thread_name})")
+
+
+profiler = StartupProfiler()
+
+
+def warm_up():
+    """
+    后台预热重量级模块
+    窗口显示后在后台线程中调用，用户第一次生成词云或翻译时不必再等待
+    """
+    with profiler.phase("import requests"):
+        import requests  # noqa: F401
+    with profiler.phase("import deep_translator"):
+        import deep_translator  # noqa: F401
+    with profiler.phase("关键词进程池 (jieba 词典)"):
+        from app.core.keywords import warm_keyword_pool
+        try:
+            warm_keyword_pool()
+        except Exception as e:
+            print(f"Keyword Pool Warm-up Error: {e}")
+    with profiler.phase("搜索索引 (补建旧存档)"):
+        from app.core.archive import get_archive
+        try:
+            get_archive().index_missing()
+        except Exception as e:
+            print(f"Search Index Error: {e}")
+    with profiler.phase("import wordcloud"):
+        import wordcloud  # noqa: F401
+    profiler.report("启动耗时 (含后台预热)")
+
+
+def start_background_warm_up():
+    """在守护线程中预热，不阻塞 GUI"""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
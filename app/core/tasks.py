@@ -0,0 +1,206 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from app.config.settings import TASK_MAX_WORKERS
+
+# 不依赖 PyQt6 的任务调度：界面点击、后台刷新、导出等都经过同一个有界线程池
+
+# 优先级：数值越小越先执行
+PRIORITY_HIGH = 0  # 用户正在等待的操作 (查看日报、生成词云)
+PRIORITY_NORMAL = 1  # 导出等较长任务
+PRIORITY_LOW = 2  # 后台刷新、定位等
+
+
+class TaskCancelled(Exception):
+    """任务已被取消 (由 check_cancelled 在任务内部抛出)"""
+
+
+_current = threading.local()
+
+
+def check_cancelled():
+    """在长任务的各阶段之间调用：当前任务已被所有调用方取消时抛出 TaskCancelled"""
+    task = getattr(_current, "task", None)
+    if task is not None and task.cancel_event.is_set():
+        raise TaskCancelled()
+
+
+class _Task:
+    def __init__(self, key, func, args, kwargs, priority):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.future = Future()
+        self.cancel_event = threading.Event()
+        self.subscribers = 0
+        self.started = False
+
+
+class TaskHandle:
+    """
+    调用方持有的任务句柄
+    合并执行时多个句柄共享同一个任务；取消只影响自己，所有句柄都取消后任务才真正取消
+    """
+
+    def __init__(self, scheduler, task):
+        self._scheduler = scheduler
+        self._task = task
+        self._cancelled = False
+
+    @property
+    def key(self):
+        return self._task.key
+
+    def cancel(self):
+        if not self._cancelled:
+            self._cancelled = True
+            self._scheduler._unsubscribe(self._task)
+
+    def cancelled(self):
+        return self._cancelled or self._task.future.cancelled()
+
+    def done(self):
+        return self._cancelled or self._task.future.done()
+
+    def result(self, timeout=None):
+        if self._cancelled:
+            raise TaskCancelled()
+        return self._task.future.result(timeout)
+
+    def add_done_callback(self, callback):
+        """任务结束后在执行线程中调用 callback(handle)；句柄已取消时不调用"""
+        def on_done(_future):
+            if not self._cancelled:
+                callback(self)
+        self._task.future.add_done_callback(on_done)
+
+
+class TaskScheduler:
+    """
+    带优先级的有界任务调度器
+    1. 同一 key 正在排队或执行时，新的提交直接共享这次执行的结果 (请求合并)
+    2. 排队中的任务按优先级、提交顺序执行
+    3. 工作线程按需创建，最多 max_workers 个
+    """
+
+    def __init__(self, max_workers=TASK_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._queue = []  # [(优先级, 序号, 任务)]
+        self._inflight = {}  # key -> 任务
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._threads = []
+        self._idle = 0
+
+    def submit(self, func, *args, key=None, priority=PRIORITY_NORMAL, **kwargs):
+        """提交任务，返回 TaskHandle；key 为 None 时不参与合并"""
+        with self._lock:
+            task = self._inflight.get(key) if key is not None else None
+            if task is None:
+                task = _Task(key, func, args, kwargs, priority)
+                if key is not None:
+                    self._inflight[key] = task
+                heapq.heappush(self._queue, (priority, next(self._counter), task))
+                # 排队中还没有线程认领的任务多于空闲线程时再开新线程 (被唤醒的线程在取到任务前仍计为空闲)
+                if len(self._queue) > self._idle and len(self._threads) < self.max_workers:
+                    thread = threading.Thread(target=self._work, name=f"task-{len(self._threads)}", daemon=True)
+                    self._threads.append(thread)
+                    thread.start()
+                self._not_empty.notify()
+            elif priority < task.priority and not task.started:
+                # 合并到已排队的任务时，按更高的优先级重新排队
+                task.priority = priority
+                heapq.heappush(self._queue, (priority, next(self._counter), task))
+                self._not_empty.notify()
+            task.subscribers += 1
+            return TaskHandle(self, task)
+
+    def _unsubscribe(self, task):
+        with self._lock:
+            task.subscribers -= 1
+            if task.subscribers > 0:
+                return
+            task.cancel_event.set()
+            if self._inflight.get(task.key) is task:
+                del self._inflight[task.key]
+        # 还没开始执行的任务直接取消；正在执行的任务只能在 check_cancelled 处停下
+        task.future.cancel()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+                while not self._queue:
+                    self._not_empty.wait()
+                self._idle -= 1
+                _, _, task = heapq.heappop(self._queue)
+                # 提高优先级时同一任务会入队两次，只执行一次
+                if task.started:
+                    continue
+                task.started = True
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            _current.task = task
+            try:
+                result, error = task.func(*task.args, **task.kwargs), None
+            except BaseException as e:
+                result, error = None, e
+            finally:
+                _current.task = None
+            # 先移出合并表再发布结果，之后的提交会重新执行
+            with self._lock:
+                if task.key is not None and self._inflight.get(task.key) is task:
+                    del self._inflight[task.key]
+            if error is not None:
+                task.future.set_exception(error)
+            else:
+                task.future.set_result(result)
+
+
+class SingleFlight:
+    """
+    同步调用的请求合并
+    同一 key 同时只执行一次 func，其余调用方等待并共享结果 (或异常)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_task_scheduler():
+    """获取全局任务调度器 (首次使用时创建)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = TaskScheduler()
+    return _scheduler
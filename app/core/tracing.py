@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 进程内所有耗时记录，超出上限后丢弃最早的
+_MAX_SPANS = 100000
+_spans = deque(maxlen=_MAX_SPANS)
+_total = 0  # 累计记录数，用于定位某次运行开始后的记录
+_lock = threading.Lock()
+_origin = time.perf_counter()
+
+
+@contextmanager
+def span(name, **fields):
+    """
+    记录一个阶段的耗时
+    用法:
+        with span("rss.download", url=url) as s:
+            ...
+            s["bytes"] = len(content)
+    fields 中的 bytes / items 会在汇总时累加
+    """
+    global _total
+    record = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        end = time.perf_counter()
+        event = (name, start - _origin, end - start, threading.get_ident(), record)
+        with _lock:
+            _spans.append(event)
+            _total += 1
+
+
+def _mark():
+    with _lock:
+        return _total
+
+
+def _since(index):
+    with _lock:
+        dropped = _total - len(_spans)
+        return list(_spans)[max(0, index - dropped):]
+
+
+class RunTrace:
+    """
+    一次运行 (例如一次全球导出) 的耗时记录
+    记录的是运行期间整个进程内的所有阶段；同时进行的多个任务会出现在同一份记录里
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.spans = []
+        self.wall = 0.0
+        self._index = _mark()
+        self._start = time.perf_counter()
+
+    def finish(self):
+        self.wall = time.perf_counter() - self._start
+        self.spans = _since(self._index)
+        return self
+
+    def summary(self):
+        """按阶段汇总，返回 [(阶段, 次数, 总耗时 ms, 字节数, 条数), ...]，按总耗时降序"""
+        stages = {}
+        for name, _, duration, _, record in self.spans:
+            stage = stages.setdefault(name, [0, 0.0, 0, 0])
+            stage[0] += 1
+            stage[1] += duration * 1000
+            stage[2] += record.get("bytes", 0) or 0
+            stage[3] += record.get("items", 0) or 0
+        rows = [(name, count, total_ms, nbytes, items) for name, (count, total_ms, nbytes, items) in stages.items()]
+        return sorted(rows, key=lambda row: -row[2])
+
+    def write_chrome_trace(self, directory):
+        """
+        写入 Chrome Trace 格式 (chrome://tracing 或 Perfetto 可直接打开)
+        返回文件路径
+        """
+        trace_dir = os.path.join(directory, "traces")
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.name}.json")
+        pid = os.getpid()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"traceEvents": [\n')
+            for i, (name, start, duration, tid, record) in enumerate(self.spans):
+                event = {"name": name, "ph": "X", "ts": round(start * 1e6), "dur": round(duration * 1e6),
+                         "pid": pid, "tid": tid, "args": record}
+                f.write(("" if i == 0 else ",\n") + json.dumps(event, ensure_ascii=False, default=str))
+            f.write(f'\n], "otherData": {json.dumps({"run": self.name, "wall_ms": self.wall * 1000})}}}\n')
+        return path
+
+
+def format_summary(trace):
+    """文本形式的阶段汇总"""
+    lines = [f"{trace.name}: 总耗时 {trace.wall * 1000:.0f} ms"]
+    for name, count, total_ms, nbytes, items in trace.summary():
+        extra = []
+        if nbytes:
+            extra.append(f"{nbytes / 1024:.1f} KB")
+        if items:
+            extra.append(f"{items} 条")
+        lines.append(f"  {name:<20} x{count:<4} {total_ms:9.1f} ms  {' '.join(extra)}")
+    return "\n".join(lines)
@@ -0,0 +1,239 @@
+from datetime import date, timedelta
+import numpy as np
+from scipy import sparse
+from app.config.settings import COUNTRY_CONFIGS
+from app.core.api import fetch_news_titles, translate_batch
+from app.core.fetcher import fetch_regions
+from app.core.keywords import tokenize_many
+from app.core.language import feed_language
+from app.core.tracing import span
+
+
+def build_doc_term_matrix(token_lists):
+    """
+    构建稀疏文档-词矩阵 (CSR，行=标题，列=词，值=出现次数)
+    返回 (矩阵, 词表列表)
+    """
+    vocabulary = {}
+    indices, indptr = [], [0]
+    for tokens in token_lists:
+        for token in tokens:
+            indices.append(vocabulary.setdefault(token, len(vocabulary)))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(token_lists), len(vocabulary))
+    )
+    matrix.sum_duplicates()  # 同一标题内重复的词合并计数
+    terms = [None] * len(vocabulary)
+    for term, index in vocabulary.items():
+        terms[index] = term
+    return matrix, terms
+
+
+def _top_indices(scores, k):
+    """取分数最高的 k 个下标 (降序)，argpartition 避免全排序"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def analyze_trending(region_names, token_lists, row_regions, top_k=20, cooccur_k=5):
+    """
+    跨地区热点分析 (全部为矩阵运算)
+    region_names: 地区名称列表
+    token_lists: 每条标题的词列表
+    row_regions: 每条标题所属地区的下标
+    返回 {"regions": {地区: [(词, 分数, 相对全球的提升倍数), ...]},
+          "global": [(词, 分数, 出现地区数), ...],
+          "cooccurrence": {词: [(共现词, 共现标题数), ...]}}
+    """
+    doc_term, terms = build_doc_term_matrix(token_lists)
+    return analyze_doc_term(region_names, doc_term, terms, row_regions, top_k, cooccur_k)
+
+
+def analyze_doc_term(region_names, doc_term, terms, row_regions, top_k=20, cooccur_k=5):
+    """同 analyze_trending，输入为已经构建好的文档-词矩阵 (列式存储直接生成，不经过词列表)"""
+    result = {"regions": {name: [] for name in region_names}, "global": [], "cooccurrence": {}}
+    if doc_term.nnz == 0:
+        return result
+
+    n_regions = len(region_names)
+    # 地区指示矩阵 (地区 x 标题)，相乘得到地区-词计数矩阵
+    indicator = sparse.csr_matrix(
+        (np.ones(len(row_regions), dtype=np.float32), (np.asarray(row_regions), np.arange(len(row_regions)))),
+        shape=(n_regions, doc_term.shape[0])
+    )
+    region_term = (indicator @ doc_term).tocsr()
+
+    # 地区内词频 (按地区总词数归一化)
+    region_totals = np.asarray(region_term.sum(axis=1)).ravel()
+    region_totals[region_totals == 0] = 1
+    region_tf = sparse.diags(1.0 / region_totals) @ region_term
+
+    # 地区级 IDF：只在少数地区出现的词更能代表该地区
+    region_df = np.asarray((region_term > 0).sum(axis=0)).ravel()
+    idf = np.log((1 + n_regions) / (1 + region_df)) + 1.0
+    region_scores = (region_tf @ sparse.diags(idf)).tocsr()
+
+    # 全球词频，用于计算地区相对全球的提升倍数
+    global_counts = np.asarray(region_term.sum(axis=0)).ravel()
+    global_tf = global_counts / global_counts.sum()
+
+    for r, name in enumerate(region_names):
+        row = region_scores.getrow(r)
+        if row.nnz == 0:
+            continue
+        top = _top_indices(row.data, top_k)
+        order = row.indices[top]
+        lift = region_tf[r, order].toarray().ravel() / global_tf[order]
+        result["regions"][name] = [
+            (terms[i], float(score), float(l)) for i, score, l in zip(order, row.data[top], lift)
+        ]
+
+    # 全球热点：覆盖地区越多、总出现次数越多越靠前
+    global_scores = (region_df / n_regions) * np.log1p(global_counts)
+    global_top = _top_indices(global_scores, top_k)
+    result["global"] = [(terms[i], float(global_scores[i]), int(region_df[i])) for i in global_top]
+
+    # 共现：二值化后 B^T B 得到两两共现的标题数，只计算全球热点词对应的列
+    binary = (doc_term > 0).astype(np.float32).tocsc()
+    hot = binary[:, global_top]
+    cooccur = (hot.T @ binary).toarray()
+    for row_index, term_index in enumerate(global_top):
+        counts = cooccur[row_index]
+        counts[term_index] = 0
+        partners = _top_indices(counts, cooccur_k)
+        result["cooccurrence"][terms[term_index]] = [
+            (terms[j], int(counts[j])) for j in partners if counts[j] > 0
+        ]
+    return result
+
+
+def collect_global_titles(target_lang='zh-CN', configs=COUNTRY_CONFIGS, on_done=None):
+    """
+    并发抓取所有地区的标题并统一翻译
+    返回 (地区名称列表, 标题列表, 每条标题所属地区下标)
+    """
+    results = fetch_regions(configs, lambda name, config: fetch_news_titles(config["url"]), on_done=on_done)
+    region_names, titles, row_regions, title_langs = [], [], [], []
+    for r, (name, region_titles) in enumerate(results):
+        region_names.append(name)
+        lang = feed_language(configs[name]["url"], configs[name].get("lang"))
+        for title in region_titles or []:
+            titles.append(title)
+            row_regions.append(r)
+            title_langs.append(lang)
+    # 所有地区合并成一批翻译 (内部按源语言分组)
+    titles = translate_batch(titles, target_lang, source_lang=title_langs)
+    return region_names, titles, row_regions
+
+
+def global_hot_topics(target_lang='zh-CN', configs=COUNTRY_CONFIGS, top_k=20, on_done=None):
+    """全球热点：抓取 -> 翻译 -> 分词 (一次) -> 矩阵分析"""
+    region_names, titles, row_regions = collect_global_titles(target_lang, configs, on_done)
+    with span("keywords.tokenize", items=len(titles)):
+        token_lists = tokenize_many(titles)
+    with span("trending.matrix", items=len(token_lists)):
+        return analyze_trending(region_names, token_lists, row_regions, top_k=top_k)
+
+
+def _date_range(days, end_date=None):
+    """最近 days 天 (含 end_date，默认今天) 的起止日期字符串"""
+    end = date.fromisoformat(end_date) if end_date else date.today()
+    return (end - timedelta(days=days - 1)).isoformat(), end.isoformat()
+
+
+def history_hot_topics(days=30, target_lang='zh-CN', top_k=20, end_date=None, store=None):
+    """
+    多日全球热点：直接分析本地存档 (列式存储，不联网、不翻译)
+    返回 analyze_trending 的结构，另含 "days" 和 "timeline": {全球热词: 每天出现的标题数}
+    """
+    from app.core.headline_store import get_headline_store
+
+    store = store or get_headline_store()
+    start_date, end_date = _date_range(days, end_date)
+    frame = store.window(start_date, end_date, tokens=target_lang)
+    if not len(frame):
+        return {"regions": {}, "global": [], "cooccurrence": {}, "days": days, "timeline": {}}
+    # 只保留窗口内出现过的地区，地区编号映射为连续下标
+    present = np.unique(frame.region)
+    region_names = [store.regions.names[code] for code in present]
+    row_regions = np.searchsorted(present, frame.region)
+    with span("trending.matrix", items=len(frame)):
+        doc_term, terms = frame.doc_term(target_lang, store.terms.names)
+        result = analyze_doc_term(region_names, doc_term, terms, row_regions, top_k=top_k)
+        result["days"] = days
+        result["timeline"] = term_timeline(frame, doc_term, terms, [term for term, _, _ in result["global"]],
+                                           date.fromisoformat(start_date).toordinal(), days)
+    return result
+
+
+def term_timeline(frame, doc_term, terms, selected, first_day, days):
+    """每个词在各天出现的标题数：词列 (转置) 乘以 标题-日期指示矩阵"""
+    if not selected or doc_term.nnz == 0:
+        return {}
+    column = {term: i for i, term in enumerate(terms)}
+    cols = [column[term] for term in selected]
+    offsets = frame.day - first_day
+    by_day = sparse.csr_matrix(
+        (np.ones(len(frame), dtype=np.float32), (np.arange(len(frame)), offsets)), shape=(len(frame), days)
+    )
+    counts = ((doc_term[:, cols] > 0).astype(np.float32).T @ by_day).toarray()
+    return {term: counts[i].astype(int).tolist() for i, term in enumerate(selected)}
+
+
+def history_keywords(region, days=30, target_lang='zh-CN', top_k=20, end_date=None, store=None):
+    """
+    某地区多日热词：地区内词频 x 全部地区的 IDF (按标题计)
+    返回 [(词, 权重), ...]，与 keyword_report 的关键词列表格式相同；没有存档时返回空列表
+    """
+    from app.core.headline_store import get_headline_store
+
+    store = store or get_headline_store()
+    frame = store.window(*_date_range(days, end_date), tokens=target_lang)
+    if not len(frame):
+        return []
+    doc_term, terms = frame.doc_term(target_lang, store.terms.names)
+    rows = frame.region == store.regions.lookup(region)
+    if not rows.any() or doc_term.nnz == 0:
+        return []
+    counts = np.asarray(doc_term[rows].sum(axis=0)).ravel()
+    df = np.asarray((doc_term > 0).sum(axis=0)).ravel()
+    scores = counts / counts.sum() * (np.log((1 + len(frame)) / (1 + df)) + 1.0)
+    top = _top_indices(scores, top_k)
+    return [(terms[i], float(scores[i])) for i in top if counts[i] > 0]
+
+
+_SPARK = "▁▂▃▄▅▆▇█"
+
+
+def _sparkline(counts, width=30):
+    """每日计数 -> 字符走势图，天数多时按时间顺序合并成不超过 width 段"""
+    if len(counts) > width:
+        counts = [int(part.sum()) for part in np.array_split(np.asarray(counts), width)]
+    peak = max(counts) or 1
+    return "".join(_SPARK[round(c / peak * (len(_SPARK) - 1))] for c in counts)
+
+
+def format_trending_report(result, top_n=10):
+    """把分析结果整理成文本报告"""
+    days = result.get("days")
+    lines = [f"【近 {days} 天全球热点 Top】" if days else "【全球热点 Top】"]
+    timeline = result.get("timeline", {})
+    for term, score, region_count in result["global"]:
+        partners = "、".join(word for word, _ in result["cooccurrence"].get(term, []))
+        lines.append(f"- {term} (分数: {score:.2f}, {region_count} 个地区)" +
+                     (f"  相关: {partners}" if partners else ""))
+        if term in timeline:
+            lines.append(f"   每日: {_sparkline(timeline[term])} (共 {sum(timeline[term])} 条)")
+    for name, topics in result["regions"].items():
+        lines.append(f"\n【{name}】")
+        if not topics:
+            lines.append("   (无数据)")
+        for term, score, lift in topics[:top_n]:
+            lines.append(f"- {term} (TF-IDF: {score:.3f}, 相对全球 x{lift:.1f})")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,162 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple
+from app.config.settings import WORDCLOUD_FONT_PATH, WORDCLOUD_RENDER_CACHE_SIZE
+from app.core.tracing import span
+
+# 词云渲染参数 (全分辨率)
+RENDER_PARAMS = {
+    # 1. 增大画布尺寸，给文字更多空间
+    "width": 1000,
+    "height": 800,
+    # 2. 背景色
+    "background_color": "white",
+    # 3. 减少显示的词数 (从50减到30)，少即是多，避免拥挤
+    "max_words": 30,
+    # 4. 【关键】增加词与词之间的间距 (默认是0，改成 5 或 10)
+    "margin": 5,
+    # 5. 最小字号，防止出现看不清的蚂蚁字
+    "min_font_size": 15,
+    # 6. 词频关联度 (0-1)，越大则高频词越大，拉开视觉差距
+    "relative_scaling": 0.6,
+    # 7. 尽量让文字水平排列 (0.9 表示 90% 的词是水平的)，垂直文字容易造成视觉混乱
+    "prefer_horizontal": 0.9,
+    # 8. 颜色系 (可选，tab10 颜色对比度较高)
+    "colormap": "tab10",
+    # 固定随机种子，相同词频得到相同布局，缓存才有意义
+    "random_state": 42,
+}
+
+# 预览图按此比例缩小，布局搜索的计算量大约按面积下降
+PREVIEW_FACTOR = 4
+
+# 常见系统的中文字体位置
+_FONT_CANDIDATES = [
+    # Windows：微软雅黑 (msyh.ttc) 是 Windows 标配
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/simhei.ttf",
+    # macOS
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "/Library/Fonts/Arial Unicode.ttf",
+    # Linux
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc",
+]
+
+
+@functools.lru_cache(maxsize=1)
+def resolve_font_path():
+    """
+    查找可显示中文的字体 (结果缓存，只查一次)
+    顺序：配置 -> 常见路径 -> fontconfig (fc-list) -> None (使用 wordcloud 自带字体，中文会乱码)
+    """
+    if WORDCLOUD_FONT_PATH and os.path.exists(WORDCLOUD_FONT_PATH):
+        return WORDCLOUD_FONT_PATH
+
+    for path in _FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+
+    if sys.platform.startswith("linux"):
+        try:
+            output = subprocess.run(["fc-list", ":lang=zh", "file"], capture_output=True,
+                                    text=True, timeout=5).stdout
+            for line in output.splitlines():
+                path = line.split(":")[0].strip()
+                if path and os.path.exists(path):
+                    return path
+        except (OSError, subprocess.SubprocessError):
+            pass
+        for path in glob.glob("/usr/share/fonts/**/*CJK*.tt[cf]", recursive=True):
+            return path
+
+    print("Warning: 未找到中文字体，词云中的中文可能显示为方块")
+    return None
+
+
+def _cache_key(freq_dict, params):
+    payload = json.dumps([sorted(freq_dict.items()), sorted(params.items())],
+                         ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class RenderedCloud(NamedTuple):
+    """渲染结果"""
+    wordcloud: Any  # WordCloud 对象，layout_ 即布局
+    array: Any  # numpy uint8 数组 (高, 宽, 3)，C 连续，可直接包装成 QImage
+
+
+class RenderCache:
+    """词云渲染缓存：键为 (词频哈希, 渲染参数)，值为 RenderedCloud (布局 + 图片)"""
+
+    def __init__(self, max_size=WORDCLOUD_RENDER_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        return None
+
+    def get_params(self, freq_dict, params):
+        """按 (词频, 参数) 查询"""
+        return self.get(_cache_key(freq_dict, params))
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+render_cache = RenderCache()
+
+
+def preview_params(params=RENDER_PARAMS, factor=PREVIEW_FACTOR):
+    """由全分辨率参数推出低分辨率预览参数"""
+    preview = dict(params)
+    preview["width"] = max(1, params["width"] // factor)
+    preview["height"] = max(1, params["height"] // factor)
+    preview["margin"] = max(1, params["margin"] // factor)
+    preview["min_font_size"] = max(4, params["min_font_size"] // factor)
+    return preview
+
+
+def render_word_cloud(freq_dict, params=RENDER_PARAMS):
+    """
+    渲染词云，返回 RenderedCloud
+    相同词频与参数直接返回缓存结果，不再重新搜索布局
+    """
+    key = _cache_key(freq_dict, params)
+    cached = render_cache.get(key)
+    if cached is not None:
+        return cached
+
+    import numpy as np
+    from wordcloud import WordCloud  # 延迟导入，加快启动
+
+    with span("wordcloud.layout", items=len(freq_dict), width=params["width"], height=params["height"]):
+        wc = WordCloud(font_path=resolve_font_path(), **params)
+        wc.generate_from_frequencies(freq_dict)
+    with span("wordcloud.draw") as trace:
+        # to_array() 得到 RGB 数组，确保 C 连续，GUI 端可零拷贝包装
+        result = RenderedCloud(wc, np.ascontiguousarray(wc.to_array(), dtype=np.uint8))
+        trace["bytes"] = result.array.nbytes
+    render_cache.put(key, result)
+    return result
@@ -1,23 +1,118 @@
-from PyQt6.QtCore import QThread, pyqtSignal
-from app.core.api import fetch_ip_address, fetch_news_data, fetch_news_titles, translate_text
-from app.config.settings import COUNTRY_CONFIGS
 import time
-import jieba
-import jieba.analyse
-from wordcloud import WordCloud
-import io
+from concurrent.futures import CancelledError
+from PyQt6.QtCore import QObject, pyqtSignal
+from app.config.settings import EXPORT_DEFAULT_FORMATS
+from app.core.api import fetch_ip_address, fetch_news_data, fetch_news_with_status, region_for_url
+from app.core.archive import get_archive
+from app.core.feed_cache import get_feed_cache
+from app.core.fetcher import fetch_regions
+from app.core.service import export_global_report, keyword_report, history_keyword_report
+from app.core.tasks import (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, TaskCancelled,
+                            check_cancelled, get_task_scheduler)
+from app.core.tracing import RunTrace
+from app.core.wordcloud_render import RENDER_PARAMS, preview_params, render_cache, render_word_cloud
+
+
+class Worker(QObject):
+    """
+    后台任务基类 (代替每次新建 QThread)
+    start() 把 compute() 交给全局任务调度器 (有界线程池，按优先级执行)，
+    完成后在工作线程中调用 deliver(结果)，由子类转成信号 (跨线程信号自动排队到界面线程)
+    key 相同的任务仍在进行时会合并执行，各自收到同一份结果；
+    合并时只有第一个发起的 Worker 会收到进度类信号
+    cancel() 后不再发出任何信号
+    """
+
+    def __init__(self, key=None, priority=PRIORITY_NORMAL):
+        super().__init__()
+        self.key = key
+        self.priority = priority
+        self.handle = None
+
+    def start(self):
+        self.handle = get_task_scheduler().submit(self.compute, key=self.key, priority=self.priority)
+        self.handle.add_done_callback(self._on_done)
+
+    def cancel(self):
+        if self.handle is not None:
+            self.handle.cancel()
+
+    def isRunning(self):
+        return self.handle is not None and not self.handle.done()
+
+    def emit_progress(self, signal, *args):
+        """在工作线程中发出进度类信号 (预览、进度文字)；cancel() 之后不再发出"""
+        if self.handle is not None and self.handle.cancelled():
+            return
+        signal.emit(*args)
+
+    def _on_done(self, handle):
+        try:
+            result = handle.result()
+        except (TaskCancelled, CancelledError):
+            return
+        except Exception as e:
+            print(f"Task Error: {e}")
+            return
+        self.deliver(result)
+
+    def compute(self):
+        raise NotImplementedError
+
+    def deliver(self, result):
+        raise NotImplementedError
+
+
+class TracedWorker(Worker):
+    """
+    带耗时记录的任务基类
+    子类实现 run_traced() 返回结果、deliver_traced(结果) 发出信号；
+    各阶段耗时通过 trace_signal 发出，指定 trace_dir 时同时写入 Chrome Trace 文件
+    """
+    trace_signal = pyqtSignal(object)  # RunTrace
+
+    def __init__(self, trace_name, trace_dir=None, key=None, priority=PRIORITY_NORMAL):
+        super().__init__(key, priority)
+        self.trace_name = trace_name
+        self.trace_dir = trace_dir
+
+    def compute(self):
+        trace = RunTrace(self.trace_name)
+        try:
+            return self.run_traced(), trace
+        finally:
+            trace.finish()
+            if self.trace_dir:
+                try:
+                    trace.write_chrome_trace(self.trace_dir)
+                except OSError as e:
+                    print(f"Trace Write Error: {e}")
 
+    def deliver(self, result):
+        result, trace = result
+        self.trace_signal.emit(trace)
+        self.deliver_traced(result)
 
-class DataWorker(QThread):
-    """单次任务线程 (IP 或 日报新闻)"""
+    def run_traced(self):
+        raise NotImplementedError
+
+    def deliver_traced(self, result):
+        raise NotImplementedError
+
+
+class DataWorker(TracedWorker):
+    """单次任务 (IP 或 日报新闻)"""
     result_signal = pyqtSignal(dict)
 
-    def __init__(self, task_type, **kwargs):
-        super().__init__()
+    def __init__(self, task_type, trace_dir=None, **kwargs):
+        # 同一地址的请求合并；查看日报是用户在等待的操作，定位放在后面
+        key = (task_type, kwargs.get("url"))
+        priority = PRIORITY_HIGH if task_type == "news" else PRIORITY_LOW
+        super().__init__(task_type, trace_dir, key=key, priority=priority)
         self.task_type = task_type
         self.params = kwargs
 
-    def run(self):
+    def run_traced(self):
         result = {"type": self.task_type, "success": False, "data": None}
 
         if self.task_type == "ip":
@@ -30,122 +125,223 @@ class DataWorker(QThread):
 
         elif self.task_type == "news":
             url = self.params.get("url")
-            news_list = fetch_news_data(url, do_translate=True)
+            news_list, status = fetch_news_with_status(url, do_translate=True)
+            result["url"] = url
+            result["status"] = status
             if news_list:
                 result["success"] = True
                 result["data"] = news_list
+                # RSS 实际抓取时间，用于显示内容的新鲜度
+                result["fetched_at"] = get_feed_cache().load_meta(url).get("fetched_at")
             else:
                 result["error"] = "RSS解析失败或超时"
 
+        return result
+
+    def deliver_traced(self, result):
         self.result_signal.emit(result)
 
 
-class BatchExportWorker(QThread):
-    """批量导出全球日报线程"""
+class BatchExportWorker(TracedWorker):
+    """
+    批量导出全球日报任务
+    流程见 service.export_global_report，这里只负责把回调转成信号
+    """
     progress_signal = pyqtSignal(str, int)
-    finished_signal = pyqtSignal(str)
+    region_signal = pyqtSignal(str, list, str)  # (地区名称, 新闻列表, 来源: live/fresh/stale/skipped/...)
+    dedup_signal = pyqtSignal(list)  # 出现在多个地区的新闻簇
+    finished_signal = pyqtSignal(bool, str)  # (是否成功, 文件路径 (多个格式时每行一个) 或 错误信息)
+
+    def __init__(self, base_path, header, date_str=None, trace_dir=None, formats=EXPORT_DEFAULT_FORMATS):
+        # 重复点击导出同一组文件时合并为一次
+        super().__init__("export", trace_dir, key=("export", base_path, tuple(formats)))
+        self.base_path = base_path
+        self.header = header
+        self.date_str = date_str
+        self.formats = list(formats)
+
+    def run_traced(self):
+        try:
+            paths = export_global_report(
+                self.base_path, self.header, self.date_str,
+                on_progress=self.progress_signal.emit,
+                on_region=self.region_signal.emit,
+                on_dedup=self.dedup_signal.emit,
+                formats=self.formats
+            )
+        except Exception as e:
+            return False, str(e)
+        return True, "\n".join(paths)
 
-    def run(self):
-        full_content = ""
-        total_countries = len(COUNTRY_CONFIGS)
+    def deliver_traced(self, result):
+        self.finished_signal.emit(*result)
 
-        for index, (name, config) in enumerate(COUNTRY_CONFIGS.items(), 1):
-            percent = int((index / total_countries) * 100)
-            self.progress_signal.emit(f"正在获取并翻译: {name} ...", percent)
-            news_list = fetch_news_data(config["url"], do_translate=True)
 
-            full_content += f"\n## 🌍 {name}\n"
-            if news_list:
-                for i, item in enumerate(news_list, 1):
-                    full_content += f"{i}. {item['title']}\n   [链接]: {item['link']}\n"
-            else:
-                full_content += "   (获取失败)\n"
-            time.sleep(0.5)
+class SearchWorker(Worker):
+    """全文搜索存档"""
+    finished_signal = pyqtSignal(str, list, float)  # (查询, 结果列表, 耗时 ms)
 
-        self.finished_signal.emit(full_content)
+    def __init__(self, query, limit=50):
+        super().__init__(key=("search", query, limit), priority=PRIORITY_HIGH)
+        self.query = query
+        self.limit = limit
 
+    def compute(self):
+        start = time.perf_counter()
+        try:
+            results = get_archive().search(self.query, limit=self.limit)
+        except Exception as e:
+            print(f"Search Error: {e}")
+            results = []
+        return results, (time.perf_counter() - start) * 1000
+
+    def deliver(self, result):
+        self.finished_signal.emit(self.query, *result)
+
+
+class RefreshWorker(Worker):
+    """
+    后台刷新任务 (最低优先级)
+    强制重新验证 RSS (304 时很便宜)，顺带预热翻译缓存和存档
+    """
+    result_signal = pyqtSignal(list)  # [(地区名称, 链接列表 或 None), ...]
+
+    def __init__(self, feeds):
+        super().__init__(key=("refresh", tuple(feeds)), priority=PRIORITY_LOW)
+        self.feeds = feeds  # [(地区名称, RSS 地址), ...]
+
+    def compute(self):
+        configs = {name: {"url": url} for name, url in self.feeds}
+
+        def refresh(name, config):
+            news_list = fetch_news_data(config["url"], do_translate=True, ttl=0)
+            return [item["link"] for item in news_list] if news_list else None
 
-class WordCloudWorker(QThread):
+        return fetch_regions(configs, refresh)
+
+    def deliver(self, result):
+        self.result_signal.emit(result)
+
+
+class WordCloudWorker(TracedWorker):
     """
-    词云生成线程
+    词云生成任务
     1. 抓取标题
     2. 翻译 (根据用户选择 En/Cn)
     3. 提取关键词
-    4. 生成图片对象
+    4. 生成图片 (numpy RGB 数组)
+    days > 0 时 1~3 改为从本地存档统计近 days 天的热词
     """
-    finished_signal = pyqtSignal(object, str)  # 返回 (Image对象, 关键词文本)
+    preview_signal = pyqtSignal(object)  # 低分辨率预览 (numpy RGB 数组)
+    finished_signal = pyqtSignal(object, str)  # 返回 (numpy RGB 数组, 关键词文本)
 
-    def __init__(self, rss_url, target_lang):
-        super().__init__()
+    def __init__(self, rss_url, target_lang, progressive=True, trace_dir=None, days=0):
+        super().__init__("wordcloud", trace_dir, key=("wordcloud", rss_url, target_lang, days),
+                         priority=PRIORITY_HIGH)
         self.rss_url = rss_url
         self.target_lang = target_lang  # 'zh-CN' or 'en'
+        self.progressive = progressive
+        self.days = days
 
-    def run(self):
-        # 1. 抓取
-        raw_titles = fetch_news_titles(self.rss_url)
-        if not raw_titles:
-            self.finished_signal.emit(None, "获取RSS失败")
-            return
-
-        # 2. 翻译与拼接
-        full_text = ""
-        for title in raw_titles:
-            # 如果需要中文词云，就翻译成中文；英文同理
-            trans = translate_text(title, self.target_lang)
-            full_text += trans + " "
-
-        # 3. 提取关键词 (使用 jieba)
-        # topK=20: 提取前20个关键词
-        keywords_list = jieba.analyse.extract_tags(full_text, topK=20, withWeight=True)
+    def run_traced(self):
+        # 1~3. 抓取、翻译、提取关键词 (jieba 在独立进程中执行，不占用 GUI 进程的 GIL)
+        try:
+            if self.days:
+                keywords_list, keywords_str = history_keyword_report(
+                    region_for_url(self.rss_url), self.days, self.target_lang, top_k=20)
+            else:
+                keywords_list, keywords_str = keyword_report(self.rss_url, self.target_lang, top_k=20)
+        except Exception as e:
+            return None, f"关键词提取出错: {str(e)}"
+        if keywords_list is None:
+            return None, keywords_str
         # keywords_list 结构: [('Trump', 0.8), ('Economy', 0.5)...]
 
         # 转换成字典供 WordCloud 使用
         freq_dict = {word: weight for word, weight in keywords_list}
 
-        # 生成关键词文本报告
-        keywords_str = "【今日热词 Top 20】\n"
-        for word, weight in keywords_list:
-            keywords_str += f"- {word} (权重: {weight:.2f})\n"
+        # 4. 生成词云图片 (先出低分辨率预览，再出全分辨率；相同词频直接命中渲染缓存)
+        # 输出 numpy RGB 数组，GUI 端直接包装成 QImage，不再经过 PIL tobytes 拷贝
+        # 渲染前检查是否已被取消 (用户已切换到别的地区)
+        try:
+            check_cancelled()
+            if self.progressive and render_cache.get_params(freq_dict, RENDER_PARAMS) is None:
+                preview = render_word_cloud(freq_dict, preview_params())
+                self.emit_progress(self.preview_signal, preview.array)
+                check_cancelled()
 
-        # 4. 生成词云图片
+            rendered = render_word_cloud(freq_dict, RENDER_PARAMS)
+            return rendered.array, keywords_str
 
-        try:
-            # Windows下必须指定中文字体路径，否则中文会显示乱码
-                # 微软雅黑 (msyh.ttc) 是 Windows 标配
-            font_path = "C:/Windows/Fonts/msyh.ttc"
+        except TaskCancelled:
+            raise
+        except Exception as e:
+            return None, f"生成词云出错: {str(e)}"
 
-            wc = WordCloud(
-                font_path=font_path,
-                # 1. 增大画布尺寸，给文字更多空间
-                width=1000,
-                height=800,
+    def deliver_traced(self, result):
+        self.finished_signal.emit(*result)
 
-                    # 2. 背景色
-                background_color='white',
 
-                    # 3. 减少显示的词数 (从50减到30)，少即是多，避免拥挤
-                max_words=30,
+class TrendingWorker(TracedWorker):
+    """
+    全球热点分析任务
+    抓取所有地区 -> 翻译 -> 分词 -> TF-IDF / 共现分析 -> 全球热词词云
+    days > 0 时改为分析本地存档中近 days 天的标题
+    """
+    progress_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(object, str)  # 返回 (numpy RGB 数组, 分析报告文本)
 
-                    # 4. 【关键】增加词与词之间的间距 (默认是0，改成 5 或 10)
-                margin=5,
+    def __init__(self, target_lang, trace_dir=None, days=0):
+        super().__init__("trending", trace_dir, key=("trending", target_lang, days), priority=PRIORITY_HIGH)
+        self.target_lang = target_lang
+        self.days = days
 
-                    # 5. 最小字号，防止出现看不清的蚂蚁字
-                min_font_size=15,
+    def run_traced(self):
+        # numpy / scipy 较重，只在使用时导入
+        from app.core.trending import global_hot_topics, history_hot_topics, format_trending_report
 
-                    # 6. 词频关联度 (0-1)，越大则高频词越大，拉开视觉差距
-                relative_scaling=0.6,
+        def on_done(name, titles, done_count, total):
+            self.emit_progress(self.progress_signal, f"已获取 {name} ({done_count}/{total})")
 
-                    # 7. 尽量让文字水平排列 (0.9 表示 90% 的词是水平的)，垂直文字容易造成视觉混乱
-                prefer_horizontal=0.9,
+        try:
+            if self.days:
+                result = history_hot_topics(self.days, self.target_lang)
+            else:
+                result = global_hot_topics(self.target_lang, on_done=on_done)
+        except Exception as e:
+            return None, f"热点分析出错: {str(e)}"
+        report = format_trending_report(result)
+        if not result["global"]:
+            return None, f"没有近 {self.days} 天的本地存档" if self.days else "获取RSS失败"
 
-                    # 8. 颜色系 (可选，tab10 颜色对比度较高)
-                colormap='tab10'
-            )
+        check_cancelled()
+        try:
+            freq_dict = {term: score for term, score, _ in result["global"]}
+            rendered = render_word_cloud(freq_dict, RENDER_PARAMS)
+            return rendered.array, report
+        except Exception as e:
+            return None, f"生成词云出错: {str(e)}"
 
-            wc.generate_from_frequencies(freq_dict)
-            image = wc.to_image()  # 转换为 PIL Image 对象
+    def deliver_traced(self, result):
+        self.finished_signal.emit(*result)
 
-            self.finished_signal.emit(image, keywords_str)
 
+class SaveImageWorker(Worker):
+    """在后台把 QImage 编码并保存为 PNG"""
+    finished_signal = pyqtSignal(bool, str)  # (是否成功, 路径 或 错误信息)
+
+    def __init__(self, image, path):
+        super().__init__(key=("save", path))
+        self.image = image
+        self.path = path
+
+    def compute(self):
+        try:
+            if self.image.save(self.path, "PNG"):
+                return True, self.path
+            return False, f"无法写入图片: {self.path}"
         except Exception as e:
-            self.finished_signal.emit(None, f"生成词云出错: {str(e)}")
\ No newline at end of file
+            return False, str(e)
+
+    def deliver(self, result):
+        self.finished_signal.emit(*result)
@@ -1,11 +1,14 @@
 import os
-from PyQt6.QtCore import QSettings, QDate
+from PyQt6.QtCore import QSettings, QDate, QTimer
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QComboBox, QPushButton, QTextBrowser,
+                             QLabel, QComboBox, QPushButton,
                              QProgressBar, QGroupBox, QMessageBox, QFileDialog,
                              QDateEdit)
 from app.config.settings import COUNTRY_CONFIGS
+from app.core.archive import get_archive
+from app.core.service import build_export_header, freshness_text, new_links
 from app.core.workers import DataWorker, BatchExportWorker
+from app.ui.report_view import ReportView
 
 
 class DailyReportWidget(QWidget):
@@ -13,8 +16,11 @@ class DailyReportWidget(QWidget):
         super().__init__()
         self.settings = QSettings("ReportTeam", "DailyReportAssistant")
         self.save_dir = self.settings.value("user_save_dir")
+        self.view_key, self.view_items, self.view_fetched_at = None, [], None
+        self.view_worker = None
+        self.view_url = None  # 当前视图正在刷新的 RSS 地址
         self.init_ui()
-        self.fetch_ip()
+        QTimer.singleShot(0, self.fetch_ip)
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -69,9 +75,8 @@ class DailyReportWidget(QWidget):
         self.pbar = QProgressBar()
         self.pbar.hide()
         layout.addWidget(self.pbar)
-        self.text_area = QTextBrowser()
-        self.text_area.setOpenExternalLinks(True)
-        layout.addWidget(self.text_area)
+        self.report = ReportView()
+        layout.addWidget(self.report)
 
     def update_dir_label(self):
         if self.save_dir:
@@ -80,10 +85,10 @@ class DailyReportWidget(QWidget):
             self.dir_label.setText("目录: (未设置)")
 
     def fetch_ip(self):
-        self.worker = DataWorker("ip")
-        self.worker.result_signal.connect(
+        self.ip_worker = DataWorker("ip")
+        self.ip_worker.result_signal.connect(
             lambda res: self.ip_label.setText(f"📍 属地: {res['data']}" if res['success'] else "定位失败"))
-        self.worker.start()
+        self.ip_worker.start()
 
     def choose_directory(self):
         folder = QFileDialog.getExistingDirectory(self, "选择保存文件夹", self.save_dir or "")
@@ -93,26 +98,65 @@ class DailyReportWidget(QWidget):
             self.update_dir_label()
 
     def view_single_country(self):
-        url = COUNTRY_CONFIGS[self.country_combo.currentText()]["url"]
+        key = self.country_combo.currentText()
+        # 过去的日期直接读本地存档，不走网络
+        if self.date_edit.date() < QDate.currentDate():
+            if self.view_worker is not None:
+                self.view_worker.cancel()
+            self.view_url = None
+            date_str = self.date_edit.date().toString("yyyy-MM-dd")
+            news_list = get_archive().load(key, date_str)
+            if news_list:
+                self.display_report(news_list, key)
+            else:
+                self.report.show_message(f"没有 {date_str} {key} 的本地存档。")
+            return
+        # 先显示最近一次的存档，再在后台刷新
+        _, cached, fetched_at = get_archive().load_latest(key)
+        self.view_key, self.view_items, self.view_fetched_at = key, cached, fetched_at
+        if cached:
+            self.display_report(cached, key, fetched_at, note="🔄 正在后台刷新...")
+        else:
+            self.report.show_message(f"正在获取 {key} 的新闻...")
+        url = self.view_url = COUNTRY_CONFIGS[key]["url"]
         self.pbar.show()
         self.pbar.setRange(0, 0)
-        self.worker = DataWorker("news", url=url)
-        self.worker.result_signal.connect(self.handle_result)
-        self.worker.start()
+        # 切换地区时取消上一次还没完成的刷新，避免旧结果覆盖当前视图
+        # (先提交再取消：重复点击同一地区时合并到正在进行的请求)
+        worker = DataWorker("news", url=url)
+        worker.result_signal.connect(self.handle_result)
+        worker.start()
+        if self.view_worker is not None:
+            self.view_worker.cancel()
+        self.view_worker = worker
 
     def handle_result(self, res):
+        # 已取消的刷新可能在取消前就发出了结果，不是当前地区的结果直接丢弃
+        if res.get("url") != self.view_url:
+            return
         self.pbar.hide()
         if res["success"]:
-            self.display_markdown(res["data"])
+            news_list = res["data"]
+            fresh = new_links(self.view_items, news_list) if self.view_items else set()
+            note = f"🆕 新增 {len(fresh)} 条" if fresh else ""
+            if res.get("status") == "stale":
+                note = "⚠️ 网络不可用，显示的是本地缓存"
+            self.view_items = news_list
+            self.view_fetched_at = res.get("fetched_at") or self.view_fetched_at
+            self.display_report(news_list, self.view_key, self.view_fetched_at, fresh, note)
+        elif self.view_items:
+            self.display_report(self.view_items, self.view_key, self.view_fetched_at,
+                                note="⚠️ 刷新失败，显示的是本地缓存")
         else:
-            self.text_area.setText("获取失败")
+            self.report.show_message("获取失败")
 
-    def display_markdown(self, news_list):
+    def display_report(self, news_list, country, fetched_at=None, fresh_links=(), note=""):
         date_str = self.date_edit.date().toString("yyyy-MM-dd")
-        text = f"# 📅 每日汇报\n**日期**: {date_str} | **地区**: {self.country_combo.currentText()}\n\n---\n"
-        for i, item in enumerate(news_list, 1):
-            text += f"{i}. **[{item['title']}]({item['link']})**\n   *来源: {item['source']}*\n\n"
-        self.text_area.setMarkdown(text)
+        subtitle = f"日期: {date_str} | 地区: {country}"
+        if fetched_at:
+            subtitle += f" | 更新于: {freshness_text(fetched_at)}" + (f" | {note}" if note else "")
+        self.report.set_title("📅 每日汇报", subtitle)
+        self.report.set_news(news_list, country, fresh_links, keep_scroll=self.report.model.regions() == [country])
 
     def export_all_countries(self):
         if not self.save_dir:
@@ -121,17 +165,24 @@ class DailyReportWidget(QWidget):
             return
         self.pbar.show()
         self.pbar.setRange(0, 100)
-        self.batch_worker = BatchExportWorker()
+
+        date_str = self.date_edit.date().toString("yyyy-MM-dd")
+        base_path = os.path.join(self.save_dir, date_str)
+        header = build_export_header(date_str, self.ip_label.text())
+        self.report.clear()
+        self.report.set_title("🌍 全球日报", f"日期: {date_str}")
+
+        self.batch_worker = BatchExportWorker(base_path, header, date_str, formats=["txt"])
         self.batch_worker.progress_signal.connect(
-            lambda msg, val: (self.pbar.setValue(val), self.text_area.append(msg)))
+            lambda msg, val: (self.pbar.setValue(val), self.pbar.setFormat(msg)))
+        self.batch_worker.region_signal.connect(self.report.append_region)
+        self.batch_worker.dedup_signal.connect(self.report.append_clusters)
         self.batch_worker.finished_signal.connect(self.save_file)
         self.batch_worker.start()
 
-    def save_file(self, content):
+    def save_file(self, success, info):
         self.pbar.hide()
-        date_str = self.date_edit.date().toString("yyyy-MM-dd")
-        path = os.path.join(self.save_dir, f"{date_str}.txt")
-        header = f"【全球重点新闻汇总】\n日期: {date_str}\n{self.ip_label.text()}\n{'=' * 50}\n"
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(header + content)
-        QMessageBox.information(self, "成功", f"文件已保存:\n{path}")
\ No newline at end of file
+        if success:
+            QMessageBox.information(self, "成功", f"文件已保存:\n{info}")
+        else:
+            QMessageBox.critical(self, "保存失败", info)
@@ -1,13 +1,19 @@
 import os
 from datetime import datetime
-from PyQt6.QtCore import QSettings, QDate, Qt
+from PyQt6.QtCore import QSettings, QDate, Qt, QTimer
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QComboBox, QPushButton, QTextBrowser,
+                             QLabel, QComboBox, QPushButton,
                              QProgressBar, QGroupBox, QMessageBox, QFileDialog,
-                             QDateEdit, QSystemTrayIcon, QMenu, QApplication, QStyle)
+                             QDateEdit, QSystemTrayIcon, QMenu, QApplication, QStyle,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox, QLineEdit, QToolButton)
 from PyQt6.QtGui import QAction, QIcon
-from app.config.settings import COUNTRY_CONFIGS
-from app.core.workers import DataWorker, BatchExportWorker
+from app.config.settings import COUNTRY_CONFIGS, REFRESH_TICK_MS, EXPORT_DEFAULT_FORMATS
+from app.core.archive import get_archive
+from app.core.exporters import available_formats
+from app.core.service import build_export_header, freshness_text, new_links
+from app.core.scheduler import AdaptiveRefreshScheduler, should_suspend
+from app.core.workers import DataWorker, BatchExportWorker, RefreshWorker, SearchWorker
+from app.ui.report_view import ReportView, news_row
 
 
 class MainWindow(QMainWindow):
@@ -17,12 +23,20 @@ class MainWindow(QMainWindow):
         # 初始化配置管理器
         self.settings = QSettings("ReportTeam", "DailyReportAssistant")
         self.save_dir = self.settings.value("user_save_dir")
+        # 当前单地区视图显示的内容 (刷新时与新结果比较)
+        self.view_key = None
+        self.view_url = None  # 当前视图正在刷新的 RSS 地址
+        self.view_items = []
+        self.view_fetched_at = None
+        self.view_worker = None
+        self.search_worker = None
 
         self.init_ui()
         self.init_system_tray()  # <--- 1. 初始化系统托盘
+        self.init_background_refresh()
 
-        # 启动时自动查询地理位置
-        self.fetch_ip()
+        # 启动时自动查询地理位置：推迟到窗口显示、事件循环启动之后
+        QTimer.singleShot(0, self.fetch_ip)
 
     def init_ui(self):
         self.setWindowTitle("全球每日重点汇报助手 (System Tray Edition)")
@@ -80,23 +94,67 @@ class MainWindow(QMainWindow):
         ctrl_layout.addWidget(self.btn_view)
 
         ctrl_layout.addStretch()
-        self.btn_export_all = QPushButton("💾 按日期保存全球日报 (.txt)")
+        # 导出格式：可多选，一次抓取同时写出所有选中的格式
+        self.btn_formats = QToolButton()
+        self.btn_formats.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        format_menu = QMenu(self.btn_formats)
+        saved = self.settings.value("export_formats", EXPORT_DEFAULT_FORMATS, type=list)
+        self.format_actions = {}
+        for name in available_formats():
+            action = QAction(f".{name}", format_menu, checkable=True)
+            action.setChecked(name in saved)
+            action.toggled.connect(self.update_export_formats)
+            format_menu.addAction(action)
+            self.format_actions[name] = action
+        self.btn_formats.setMenu(format_menu)
+        ctrl_layout.addWidget(self.btn_formats)
+
+        self.btn_export_all = QPushButton()
         self.btn_export_all.setObjectName("btn_accent")
         self.btn_export_all.clicked.connect(self.export_all_countries)
         ctrl_layout.addWidget(self.btn_export_all)
+        self.update_export_formats()
 
         ctrl_group.setLayout(ctrl_layout)
         layout.addWidget(ctrl_group)
 
+        # === 存档搜索 ===
+        search_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 搜索历史新闻 (所有日期、地区，中英文均可)")
+        self.search_edit.returnPressed.connect(self.search_archive)
+        self.btn_search = QPushButton("搜索")
+        self.btn_search.clicked.connect(self.search_archive)
+        search_layout.addWidget(self.search_edit)
+        search_layout.addWidget(self.btn_search)
+        layout.addLayout(search_layout)
+
         # === 底部显示区域 ===
         self.pbar = QProgressBar()
         self.pbar.hide()
         layout.addWidget(self.pbar)
 
-        self.text_area = QTextBrowser()
-        self.text_area.setPlaceholderText("等待操作...")
-        self.text_area.setOpenExternalLinks(True)
-        layout.addWidget(self.text_area)
+        self.report = ReportView()
+        layout.addWidget(self.report)
+
+        # === 耗时分析面板 ===
+        perf_group = QGroupBox("⏱ 耗时分析 (最近一次)")
+        perf_layout = QVBoxLayout()
+        self.perf_label = QLabel("暂无记录")
+        self.perf_table = QTableWidget(0, 5)
+        self.perf_table.setHorizontalHeaderLabels(["阶段", "次数", "总耗时 (ms)", "字节", "条数"])
+        self.perf_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.perf_table.verticalHeader().setVisible(False)
+        self.perf_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.perf_table.setFixedHeight(150)
+        self.chk_trace_file = QCheckBox("将 trace 写入保存目录 (traces/*.json)")
+        self.chk_trace_file.setChecked(self.settings.value("write_trace", False, type=bool))
+        self.chk_trace_file.toggled.connect(lambda on: self.settings.setValue("write_trace", on))
+        perf_layout.addWidget(self.perf_label)
+        perf_layout.addWidget(self.perf_table)
+        perf_layout.addWidget(self.chk_trace_file)
+        perf_group.setLayout(perf_layout)
+        layout.addWidget(perf_group)
 
     def init_system_tray(self):
         """配置系统托盘图标和菜单"""
@@ -131,6 +189,40 @@ class MainWindow(QMainWindow):
         # 显示托盘图标
         self.tray_icon.show()
 
+    def init_background_refresh(self):
+        """后台按自适应间隔刷新各地区，保持缓存和存档是热的"""
+        self.refresh_scheduler = AdaptiveRefreshScheduler(COUNTRY_CONFIGS)
+        self.refresh_worker = None
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.background_refresh_tick)
+        self.refresh_timer.start(REFRESH_TICK_MS)
+
+    def background_refresh_tick(self):
+        if self.refresh_worker is not None and self.refresh_worker.isRunning():
+            return
+        if should_suspend():
+            return
+        due = self.refresh_scheduler.due_feeds()
+        if not due:
+            return
+        self.refresh_worker = RefreshWorker([(feed.name, feed.url) for feed in due])
+        self.refresh_worker.result_signal.connect(self.handle_refresh_result)
+        self.refresh_worker.start()
+
+    def handle_refresh_result(self, results):
+        major = []
+        for name, links in results:
+            new_count = self.refresh_scheduler.record(name, links)
+            if self.refresh_scheduler.is_major(new_count):
+                major.append(f"{name}: {new_count} 条")
+        if major and self.tray_icon.isVisible():
+            self.tray_icon.showMessage(
+                "有新的重点新闻",
+                "\n".join(major),
+                QSystemTrayIcon.MessageIcon.Information,
+                5000
+            )
+
     # 拦截关闭事件
     def closeEvent(self, event):
         """当用户点击窗口右上角的 X 时触发"""
@@ -161,9 +253,9 @@ class MainWindow(QMainWindow):
 
     def fetch_ip(self):
         self.ip_label.setText("📍 属地: 定位中...")
-        self.worker = DataWorker("ip")
-        self.worker.result_signal.connect(self.handle_single_result)
-        self.worker.start()
+        self.ip_worker = DataWorker("ip")
+        self.ip_worker.result_signal.connect(self.handle_single_result)
+        self.ip_worker.start()
 
     def choose_directory(self):
         default_open = self.save_dir if self.save_dir else ""
@@ -177,13 +269,39 @@ class MainWindow(QMainWindow):
 
     def view_single_country(self):
         key = self.country_combo.currentText()
-        url = COUNTRY_CONFIGS[key]["url"]
-        self.btn_view.setEnabled(False)
+        # 过去的日期直接读本地存档，不走网络
+        if self.date_edit.date() < QDate.currentDate():
+            if self.view_worker is not None:
+                self.view_worker.cancel()
+            self.view_url = None
+            date_str = self.date_edit.date().toString("yyyy-MM-dd")
+            news_list = get_archive().load(key, date_str)
+            if news_list:
+                self.display_report(news_list, key)
+            else:
+                self.report.show_message(f"没有 {date_str} {key} 的本地存档。")
+            return
+        # 先显示最近一次的存档 (不等网络)，再在后台刷新
+        _, cached, fetched_at = get_archive().load_latest(key)
+        self.view_key = key
+        self.view_items = cached
+        self.view_fetched_at = fetched_at
+        if cached:
+            self.display_report(cached, key, fetched_at, note="🔄 正在后台刷新...")
+        else:
+            self.report.show_message(f"正在获取 {key} 的新闻...")
+        url = self.view_url = COUNTRY_CONFIGS[key]["url"]
         self.pbar.show()
         self.pbar.setRange(0, 0)
-        self.worker = DataWorker("news", url=url)
-        self.worker.result_signal.connect(self.handle_single_result)
-        self.worker.start()
+        # 切换地区时取消上一次还没完成的刷新，避免旧结果覆盖当前视图
+        # (先提交再取消：重复点击同一地区时合并到正在进行的请求)
+        worker = DataWorker("news", trace_dir=self.trace_dir(), url=url)
+        worker.result_signal.connect(self.handle_single_result)
+        worker.trace_signal.connect(self.show_trace)
+        worker.start()
+        if self.view_worker is not None:
+            self.view_worker.cancel()
+        self.view_worker = worker
 
     def export_all_countries(self):
         if not self.save_dir:
@@ -192,52 +310,130 @@ class MainWindow(QMainWindow):
                 return
         self.btn_export_all.setEnabled(False)
         self.btn_view.setEnabled(False)
-        self.text_area.clear()
         self.pbar.show()
         self.pbar.setRange(0, 100)
         self.pbar.setValue(0)
-        self.batch_worker = BatchExportWorker()
+
+        date_str = self.date_edit.date().toString("yyyy-MM-dd")
+        base_path = os.path.join(self.save_dir, date_str)
+        header = build_export_header(date_str, self.ip_label.text())
+        self.report.clear()
+        self.report.set_title("🌍 全球日报", f"日期: {date_str}")
+
+        self.batch_worker = BatchExportWorker(base_path, header, date_str, trace_dir=self.trace_dir(),
+                                              formats=self.export_formats())
+        self.batch_worker.trace_signal.connect(self.show_trace)
         self.batch_worker.progress_signal.connect(self.update_export_progress)
+        self.batch_worker.region_signal.connect(self.append_region_section)
+        self.batch_worker.dedup_signal.connect(self.append_dedup_section)
         self.batch_worker.finished_signal.connect(self.save_export_file)
         self.batch_worker.start()
 
+    def export_formats(self):
+        return [name for name, action in self.format_actions.items() if action.isChecked()]
+
+    def update_export_formats(self):
+        """勾选的格式变化：保存设置并更新按钮文字；全部取消时退回 txt"""
+        formats = self.export_formats()
+        if not formats:
+            self.format_actions["txt"].setChecked(True)
+            return
+        self.settings.setValue("export_formats", formats)
+        self.btn_formats.setText("格式: " + ", ".join(formats))
+        self.btn_export_all.setText("💾 按日期保存全球日报 (" + ", ".join(f".{name}" for name in formats) + ")")
+
     def handle_single_result(self, res):
-        self.btn_view.setEnabled(True)
-        self.pbar.hide()
         if res["type"] == "ip":
             self.ip_label.setText(f"📍 属地: {res['data']}" if res['success'] else "📍 属地: 获取失败")
         elif res["type"] == "news":
-            if res["success"]:
-                self.display_markdown(res["data"])
-            else:
-                self.text_area.setText("获取失败，请检查网络连接。")
+            # 已取消的刷新可能在取消前就发出了结果，不是当前地区的结果直接丢弃
+            if res.get("url") != self.view_url:
+                return
+            self.pbar.hide()
+            self.refresh_view(res)
+
+    def refresh_view(self, res):
+        """后台刷新完成：在已显示的缓存内容上原位更新，并标出新增条目"""
+        if res["success"]:
+            news_list = res["data"]
+            fresh = new_links(self.view_items, news_list) if self.view_items else set()
+            note = f"🆕 新增 {len(fresh)} 条" if fresh else ""
+            if res.get("status") == "stale":
+                note = "⚠️ 网络不可用，显示的是本地缓存"
+            self.view_items = news_list
+            self.view_fetched_at = res.get("fetched_at") or self.view_fetched_at
+            self.display_report(news_list, self.view_key, self.view_fetched_at, fresh, note)
+        elif self.view_items:
+            self.display_report(self.view_items, self.view_key, self.view_fetched_at,
+                                note="⚠️ 刷新失败，显示的是本地缓存")
+        else:
+            self.report.show_message("获取失败，请检查网络连接。")
+
+    def search_archive(self):
+        query = self.search_edit.text().strip()
+        if not query:
+            return
+        worker = SearchWorker(query)
+        worker.finished_signal.connect(self.show_search_results)
+        worker.start()
+        if self.search_worker is not None:
+            self.search_worker.cancel()
+        self.search_worker = worker
+
+    def show_search_results(self, query, results, elapsed_ms):
+        if results:
+            self.report.set_rows(news_row(item, i, item["region"],
+                                          meta=f"{item['date']} | {item['region']} | 来源: {item['source']}")
+                                 for i, item in enumerate(results, 1))
+        else:
+            self.report.show_message("没有匹配的新闻。")
+        self.report.set_title(f"🔍 搜索: {query}", f"找到 {len(results)} 条 ({elapsed_ms:.0f} ms)")
+
+    def trace_dir(self):
+        """勾选了写入 trace 时返回保存目录，否则返回 None"""
+        if self.chk_trace_file.isChecked() and self.save_dir:
+            return self.save_dir
+        return None
+
+    def show_trace(self, trace):
+        """在面板中显示各阶段耗时"""
+        rows = trace.summary()
+        self.perf_label.setText(f"{trace.name}: 总耗时 {trace.wall * 1000:.0f} ms")
+        self.perf_table.setRowCount(len(rows))
+        for r, (name, count, total_ms, nbytes, items) in enumerate(rows):
+            values = [name, str(count), f"{total_ms:.1f}", f"{nbytes / 1024:.1f} KB" if nbytes else "", str(items or "")]
+            for c, value in enumerate(values):
+                self.perf_table.setItem(r, c, QTableWidgetItem(value))
 
     def update_export_progress(self, msg, val):
         self.pbar.setValue(val)
         self.pbar.setFormat(msg)
-        self.text_area.append(msg)
 
-    def display_markdown(self, news_list):
-        country = self.country_combo.currentText()
-        date_str = self.date_edit.date().toString("yyyy-MM-dd")
-        text = f"# 📅 每日汇报\n**日期**: {date_str} | **地区**: {country}\n\n---\n"
-        for i, item in enumerate(news_list, 1):
-            text += f"{i}. **[{item['title']}]({item['link']})**\n   *来源: {item['source']}*\n\n"
-        self.text_area.setMarkdown(text)
+    def append_region_section(self, name, news_list, status=""):
+        """导出过程中每到一个地区就追加一组行，不重排已有内容"""
+        self.report.append_region(name, news_list, status)
 
-    def save_export_file(self, full_content):
+    def display_report(self, news_list, country, fetched_at=None, fresh_links=(), note=""):
+        """fetched_at 不为空时显示内容的更新时间；fresh_links 中的条目标记为新增"""
+        date_str = self.date_edit.date().toString("yyyy-MM-dd")
+        subtitle = f"日期: {date_str} | 地区: {country}"
+        if fetched_at:
+            subtitle += f" | 更新于: {freshness_text(fetched_at)}" + (f" | {note}" if note else "")
+        self.report.set_title("📅 每日汇报", subtitle)
+        # 同一地区刷新时保持滚动位置
+        self.report.set_news(news_list, country, fresh_links, keep_scroll=self.report.model.regions() == [country])
+
+    def append_dedup_section(self, clusters):
+        """导出结束前追加跨地区重复新闻汇总"""
+        self.report.append_clusters(clusters)
+
+    def save_export_file(self, success, info):
+        """导出结束：文件已由后台线程写入并原子重命名"""
         self.btn_export_all.setEnabled(True)
         self.btn_view.setEnabled(True)
         self.pbar.hide()
-        date_str = self.date_edit.date().toString("yyyy-MM-dd")
-        file_name = f"{date_str}.txt"
-        file_path = os.path.join(self.save_dir, file_name)
-        header = f"【全球重点新闻汇总】\n日期: {date_str}\n{self.ip_label.text()}\n"
-        final_text = header + ("=" * 50) + full_content
-        try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(final_text)
-            self.text_area.setMarkdown(f"# ✅ 导出成功\n\n文件已保存至:\n`{file_path}`\n\n---\n{full_content}")
-            QMessageBox.information(self, "成功", f"全球新闻已保存至：\n{file_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "保存失败", str(e))
\ No newline at end of file
+        if success:
+            self.report.append_note("✅ 导出成功，文件已保存至: " + ", ".join(info.splitlines()))
+            QMessageBox.information(self, "成功", f"全球新闻已保存至：\n{info}")
+        else:
+            QMessageBox.critical(self, "保存失败", info)
@@ -0,0 +1,285 @@
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QSize, QUrl)
+from PyQt6.QtGui import QDesktopServices, QFont
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit,
+                             QListView, QStyledItemDelegate, QStyle, QAbstractItemView)
+from app.core.exporters import status_label
+
+# 列表中每一行都是一个字典：
+#   kind: "header" (地区标题) / "item" (新闻) / "note" (提示文字)
+#   text: 显示的主文字；meta: 第二行小字 (来源、日期等)
+#   region / source / link / rank / fresh: 用于筛选、打开链接和标记新增
+ROW_ROLE = Qt.ItemDataRole.UserRole + 1
+
+ALL_REGIONS = "全部地区"
+
+
+def news_row(item, rank, region=None, fresh=False, meta=None):
+    """新闻条目 -> 列表行"""
+    if meta is None:
+        meta = f"同: {item['dup_of']}" if item.get("dup_of") else f"来源: {item.get('source') or ''}"
+    return {
+        "kind": "item",
+        "text": ("↳ " if item.get("dup_of") else "") + (item.get("title") or ""),
+        "meta": meta,
+        "region": region,
+        "source": item.get("source") or "",
+        "link": item.get("link"),
+        "rank": rank,
+        "fresh": fresh,
+    }
+
+
+class ReportModel(QAbstractListModel):
+    """日报内容模型：追加时只插入新行，不重建已有内容"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == ROW_ROLE:
+            return row
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row["text"]
+        if role == Qt.ItemDataRole.ToolTipRole and row["kind"] == "item":
+            return f"{row['text']}\n{row.get('link') or ''}"
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def regions(self):
+        return list(dict.fromkeys(row["region"] for row in self._rows if row.get("region")))
+
+
+class ReportFilterProxy(QSortFilterProxyModel):
+    """按地区、来源筛选，不改动底层数据"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.region = None
+        self.source_text = ""
+
+    def set_filter(self, region=None, source_text=""):
+        self.region = region
+        self.source_text = source_text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        row = self.sourceModel().index(source_row, 0, source_parent).data(ROW_ROLE)
+        if self.region and row.get("region") != self.region:
+            return False
+        if self.source_text:
+            # 标题行和提示在按来源筛选时隐藏
+            return row["kind"] == "item" and self.source_text in row["source"].lower()
+        return True
+
+
+class ReportDelegate(QStyledItemDelegate):
+    """
+    自绘列表行：所有行等高 (两行文字)，视图可以按固定行高直接定位，不必逐行计算布局
+    新闻：标题 + 来源；地区标题：名称 + 状态；提示：一行文字
+    """
+    PADDING = 6
+
+    def sizeHint(self, option, index):
+        # 宽度由视图决定 (铺满可见区域)，这里只给高度
+        return QSize(0, option.fontMetrics.lineSpacing() * 2 + self.PADDING * 2)
+
+    def paint(self, painter, option, index):
+        row = index.data(ROW_ROLE)
+        style = option.widget.style() if option.widget else None
+        if style is not None:
+            style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+
+        painter.save()
+        rect = option.rect.adjusted(self.PADDING * 2, self.PADDING, -self.PADDING * 2, -self.PADDING)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        text_color = option.palette.highlightedText().color() if selected else option.palette.text().color()
+        dim_color = option.palette.placeholderText().color()
+        line = option.fontMetrics.lineSpacing()
+
+        if row["kind"] == "note":
+            font = QFont(option.font)
+            font.setItalic(True)
+            painter.setFont(font)
+            painter.setPen(dim_color)
+            text = option.fontMetrics.elidedText(row["text"], Qt.TextElideMode.ElideRight, rect.width())
+            painter.drawText(rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        else:
+            if row["kind"] == "header":
+                title = row["text"]
+                font = QFont(option.font)
+                font.setBold(True)
+                font.setPointSizeF(font.pointSizeF() * 1.2)
+            else:
+                title = f"{row['rank']}. " + ("🆕 " if row.get("fresh") else "") + row["text"]
+                font = QFont(option.font)
+                font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(text_color)
+            metrics = painter.fontMetrics()
+            painter.drawText(rect.x(), rect.y() + metrics.ascent(),
+                             metrics.elidedText(title, Qt.TextElideMode.ElideRight, rect.width()))
+            painter.setFont(option.font)
+            painter.setPen(dim_color)
+            meta = option.fontMetrics.elidedText(row.get("meta") or "", Qt.TextElideMode.ElideRight, rect.width())
+            painter.drawText(rect.x(), rect.y() + line + option.fontMetrics.ascent(), meta)
+        painter.restore()
+
+
+class ReportView(QWidget):
+    """
+    日报显示区 (代替 QTextBrowser + Markdown)
+    QListView 只为可见行绘制；导出时逐个地区追加行；按地区 / 来源筛选时不重建内容
+    双击新闻打开链接
+    """
+
+    def __init__(self, placeholder="等待操作...", parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        bar = QHBoxLayout()
+        self.title_label = QLabel()
+        font = self.title_label.font()
+        font.setBold(True)
+        font.setPointSizeF(font.pointSizeF() * 1.3)
+        self.title_label.setFont(font)
+        self.subtitle_label = QLabel()
+        self.region_filter = QComboBox()
+        self.region_filter.addItem(ALL_REGIONS)
+        self.region_filter.currentIndexChanged.connect(self.apply_filter)
+        self.source_filter = QLineEdit()
+        self.source_filter.setPlaceholderText("按来源筛选")
+        self.source_filter.setClearButtonEnabled(True)
+        self.source_filter.setFixedWidth(160)
+        self.source_filter.textChanged.connect(self.apply_filter)
+        bar.addWidget(self.title_label)
+        bar.addStretch()
+        bar.addWidget(self.region_filter)
+        bar.addWidget(self.source_filter)
+        layout.addLayout(bar)
+        layout.addWidget(self.subtitle_label)
+
+        self.model = ReportModel(self)
+        self.proxy = ReportFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.list_view = QListView()
+        self.list_view.setObjectName("report_list")
+        self.list_view.setModel(self.proxy)
+        self.list_view.setItemDelegate(ReportDelegate(self.list_view))
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.list_view.setResizeMode(QListView.ResizeMode.Adjust)
+        # 等高行：布局与总行数无关，追加和滚动只处理可见区域
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.list_view.doubleClicked.connect(self.open_link)
+        layout.addWidget(self.list_view)
+
+        self.show_message(placeholder)
+
+    # ---------- 内容 ----------
+    def set_title(self, title, subtitle=""):
+        self.title_label.setText(title)
+        self.subtitle_label.setText(subtitle)
+        self.subtitle_label.setVisible(bool(subtitle))
+
+    def show_message(self, text, title=""):
+        """清空内容，只显示一行提示"""
+        self.set_title(title)
+        self.model.set_rows([{"kind": "note", "text": text}])
+        self.reset_filters()
+
+    def clear(self):
+        self.model.set_rows([])
+        self.reset_filters()
+
+    def set_news(self, news_list, region=None, fresh_links=(), keep_scroll=False):
+        """显示单个列表 (单地区日报)；keep_scroll 时保持当前滚动位置"""
+        scroll = self.list_view.verticalScrollBar()
+        position = scroll.value()
+        self.model.set_rows(news_row(item, i, region, item.get("link") in fresh_links)
+                            for i, item in enumerate(news_list, 1))
+        self.rebuild_region_filter()
+        if keep_scroll:
+            scroll.setValue(position)
+
+    def set_rows(self, rows):
+        self.model.set_rows(rows)
+        self.rebuild_region_filter()
+
+    def append_region(self, name, news_list, status=""):
+        """追加一个地区 (标题行 + 新闻)，已显示的行不受影响"""
+        label = status_label(status)
+        meta = f"{len(news_list)} 条" + (f" | {label}" if label else "")
+        rows = [{"kind": "header", "text": f"🌍 {name}", "meta": meta, "region": name}]
+        rows += [news_row(item, i, name) for i, item in enumerate(news_list, 1)]
+        if not news_list:
+            rows.append({"kind": "note", "text": "(获取失败)", "region": name})
+        self.model.append_rows(rows)
+        if self.region_filter.findText(name) < 0:
+            self.region_filter.addItem(name)
+            self.region_filter.setVisible(self.region_filter.count() > 2)
+
+    def append_clusters(self, clusters):
+        """追加跨地区重复新闻汇总"""
+        rows = [{"kind": "header", "text": "🔁 跨地区重复新闻", "meta": f"{len(clusters)} 条"}]
+        rows += [news_row({"title": cluster["title"], "link": cluster.get("link")}, i,
+                          meta=f"地区: {', '.join(cluster['regions'])}")
+                 for i, cluster in enumerate(clusters, 1)]
+        self.model.append_rows(rows)
+
+    def append_note(self, text):
+        self.model.append_rows([{"kind": "note", "text": text}])
+        self.list_view.scrollToBottom()
+
+    # ---------- 筛选 ----------
+    def rebuild_region_filter(self):
+        """内容整体替换后重建地区列表，当前选择的地区仍存在时保留 (来源筛选不变)"""
+        current = self.region_filter.currentText()
+        self.region_filter.blockSignals(True)
+        self.region_filter.clear()
+        self.region_filter.addItem(ALL_REGIONS)
+        self.region_filter.addItems(self.model.regions())
+        index = self.region_filter.findText(current)
+        self.region_filter.setCurrentIndex(max(0, index))
+        self.region_filter.setVisible(self.region_filter.count() > 2)
+        self.region_filter.blockSignals(False)
+        self.apply_filter()
+
+    def reset_filters(self):
+        self.region_filter.blockSignals(True)
+        self.region_filter.clear()
+        self.region_filter.addItem(ALL_REGIONS)
+        self.region_filter.setVisible(False)
+        self.region_filter.blockSignals(False)
+        self.source_filter.clear()
+        self.proxy.set_filter()
+
+    def apply_filter(self):
+        region = self.region_filter.currentText()
+        self.proxy.set_filter(None if region in ("", ALL_REGIONS) else region, self.source_filter.text())
+
+    def open_link(self, index):
+        row = index.data(ROW_ROLE)
+        if row and row.get("link"):
+            QDesktopServices.openUrl(QUrl(row["link"]))
@@ -1,18 +1,28 @@
 import os
-from PyQt6.QtCore import QSettings, Qt, QDate
+from PyQt6.QtCore import QSettings, Qt, QDate, QEvent, QTimer
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QComboBox, QPushButton, QTextEdit, QGroupBox,
-                             QMessageBox, QFileDialog, QDateEdit, QSplitter)
+                             QMessageBox, QFileDialog, QDateEdit, QSplitter,
+                             QSizePolicy)
 from PyQt6.QtGui import QPixmap, QImage
 from app.config.settings import COUNTRY_CONFIGS
-from app.core.workers import WordCloudWorker
+from app.core.workers import WordCloudWorker, TrendingWorker, SaveImageWorker
 
 
 class WordCloudWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.settings = QSettings("ReportTeam", "DailyReportAssistant")
-        self.current_image = None  # 存储生成的 PIL Image 对象
+        self.current_qimage = None  # 当前全分辨率图片 (QImage)
+        self._image_buffer = None  # current_qimage 引用的 numpy 数组
+        self._pixmap = None
+        self._scaled_cache = {}  # (宽, 高) -> 平滑缩放后的 QPixmap
+        # 拖动期间用快速缩放，停止调整尺寸后再平滑缩放一次
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(150)
+        self._smooth_timer.timeout.connect(self.update_scaled_pixmap)
+        self.worker = None  # 当前的分析任务
         self.init_ui()
 
     def init_ui(self):
@@ -33,10 +43,22 @@ class WordCloudWidget(QWidget):
         self.lang_combo.addItem("英文 (English)", "en")
         ctrl_layout.addWidget(self.lang_combo)
 
+        # 范围：今日实时抓取，或统计本地存档中最近若干天
+        ctrl_layout.addWidget(QLabel("范围:"))
+        self.days_combo = QComboBox()
+        self.days_combo.addItem("今日 (实时)", 0)
+        for days in (7, 30, 90):
+            self.days_combo.addItem(f"近 {days} 天 (存档)", days)
+        ctrl_layout.addWidget(self.days_combo)
+
         self.btn_gen = QPushButton("🔥 生成热词图")
         self.btn_gen.clicked.connect(self.generate_cloud)
         ctrl_layout.addWidget(self.btn_gen)
 
+        self.btn_global = QPushButton("🌐 全球热点")
+        self.btn_global.clicked.connect(self.generate_global_topics)
+        ctrl_layout.addWidget(self.btn_global)
+
         self.btn_save = QPushButton("💾 保存结果")
         self.btn_save.setObjectName("btn_accent")
         self.btn_save.clicked.connect(self.save_results)
@@ -55,6 +77,9 @@ class WordCloudWidget(QWidget):
         self.img_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.img_label.setStyleSheet("border: 2px dashed #45475A; background-color: #181825;")
         self.img_label.setMinimumSize(400, 300)
+        # 忽略 pixmap 的尺寸提示，避免设置图片后标签被撑大
+        self.img_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.img_label.installEventFilter(self)
         splitter.addWidget(self.img_label)
 
         # 文字列表
@@ -71,33 +96,105 @@ class WordCloudWidget(QWidget):
         country = self.country_combo.currentText()
         url = COUNTRY_CONFIGS[country]["url"]
         target_lang = self.lang_combo.currentData()
+        days = self.days_combo.currentData()
 
-        self.btn_gen.setEnabled(False)
         self.img_label.setText(f"正在分析 {country} 的热点数据...\n可能需要几秒钟...")
 
-        self.worker = WordCloudWorker(url, target_lang)
-        self.worker.finished_signal.connect(self.handle_result)
-        self.worker.start()
+        self.pending_scope = country.split(' ')[0] + (f"_近{days}天" if days else "")  # 取"中国"
+        worker = WordCloudWorker(url, target_lang, days=days)
+        worker.preview_signal.connect(self.show_preview)
+        worker.finished_signal.connect(self.handle_result)
+        self.start_worker(worker)
+
+    def start_worker(self, worker):
+        """
+        同一时间只保留一个分析任务：新的请求会取消还没完成的旧任务
+        先提交再取消，重复点击同一个地区时直接合并到正在进行的任务
+        """
+        worker.start()
+        if self.worker is not None:
+            self.worker.cancel()
+        self.worker = worker
+
+    def generate_global_topics(self):
+        """跨地区热点分析：所有地区一起分词并计算 TF-IDF"""
+        target_lang = self.lang_combo.currentData()
+        days = self.days_combo.currentData()
+        self.img_label.setText(f"正在统计近 {days} 天的存档..." if days else "正在抓取全球各地区的热点数据...")
+
+        self.pending_scope = "全球" + (f"_近{days}天" if days else "")
+        worker = TrendingWorker(target_lang, days=days)
+        worker.progress_signal.connect(self.show_progress)
+        worker.finished_signal.connect(self.handle_result)
+        self.start_worker(worker)
+
+    def show_preview(self, image):
+        """先显示低分辨率预览，全分辨率生成后会被替换"""
+        # 取消前已排队的预览可能晚到，只显示当前任务的
+        if self.sender() is self.worker:
+            self.show_image(image)
+
+    def show_progress(self, text):
+        if self.sender() is self.worker:
+            self.img_label.setText(text)
+
+    def show_image(self, array):
+        """
+        numpy RGB 数组 -> QImage (零拷贝包装) -> QPixmap
+        QImage 直接引用数组内存，所以数组要和 QImage 一起保留
+        """
+        height, width = array.shape[:2]
+        qim = QImage(array.data, width, height, array.strides[0], QImage.Format.Format_RGB888)
+        self._image_buffer = array
+        self.current_qimage = qim
+        self._pixmap = QPixmap.fromImage(qim)
+        self._scaled_cache.clear()
+        self.update_scaled_pixmap()
+
+    def update_scaled_pixmap(self, smooth=True):
+        """
+        按当前尺寸显示缩放后的图片
+        smooth: 平滑缩放并缓存 (同一尺寸只做一次)；False 时快速缩放，用于拖动过程中
+        """
+        if self._pixmap is None:
+            return
+        size = self.img_label.size()
+        key = (size.width(), size.height())
+        scaled = self._scaled_cache.get(key)
+        if scaled is None and not smooth:
+            scaled = self._pixmap.scaled(
+                size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.FastTransformation
+            )
+        elif scaled is None:
+            scaled = self._pixmap.scaled(
+                size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+            if len(self._scaled_cache) >= 8:
+                self._scaled_cache.pop(next(iter(self._scaled_cache)))
+            self._scaled_cache[key] = scaled
+        self.img_label.setPixmap(scaled)
+
+    def eventFilter(self, obj, event):
+        # 拖动分割条时图片区域尺寸变化：先快速缩放，停下来后由定时器平滑缩放
+        if obj is self.img_label and event.type() == QEvent.Type.Resize and self._pixmap is not None:
+            self.update_scaled_pixmap(smooth=False)
+            self._smooth_timer.start()
+        return super().eventFilter(obj, event)
 
     def handle_result(self, image, text_result):
-        self.btn_gen.setEnabled(True)
-        if image:
-            self.current_image = image
+        if image is not None:
             self.current_text = text_result
+            self.current_scope = self.pending_scope
 
             # 显示文本
             self.text_area.setText(text_result)
 
-            # 显示图片 (PIL Image -> QPixmap)
-            data = image.tobytes("raw", "RGB")
-            qim = QImage(data, image.width, image.height, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(qim)
-            self.img_label.setPixmap(pixmap.scaled(
-                self.img_label.size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            ))
-            self.img_label.setText("")  # 清除文字
+            # 显示图片
+            self.show_image(image)
             self.btn_save.setEnabled(True)
         else:
             self.img_label.setText(f"失败: {text_result}")
@@ -109,7 +206,7 @@ class WordCloudWidget(QWidget):
             return
 
         date_str = QDate.currentDate().toString("yyyy-MM-dd")
-        country = self.country_combo.currentText().split(' ')[0]  # 取"中国"
+        country = self.current_scope
 
         # 文件名
         txt_name = f"{date_str}_{country}_热词.txt"
@@ -119,12 +216,23 @@ class WordCloudWidget(QWidget):
         img_path = os.path.join(save_dir, img_name)
 
         try:
-            # 保存图片
-            self.current_image.save(img_path)
             # 保存文本
             with open(txt_path, "w", encoding="utf-8") as f:
                 f.write(self.current_text)
+        except Exception as e:
+            QMessageBox.critical(self, "保存失败", str(e))
+            return
 
+        # PNG 编码较慢，放到后台线程
+        self.btn_save.setEnabled(False)
+        self.save_worker = SaveImageWorker(self.current_qimage.copy(), img_path)
+        self.save_worker.finished_signal.connect(
+            lambda ok, info: self.on_image_saved(ok, info, img_name, txt_name))
+        self.save_worker.start()
+
+    def on_image_saved(self, success, info, img_name, txt_name):
+        self.btn_save.setEnabled(True)
+        if success:
             QMessageBox.information(self, "保存成功", f"已保存到目录:\n图片: {img_name}\n文本: {txt_name}")
-        except Exception as e:
-            QMessageBox.critical(self, "保存失败", str(e))
\ No newline at end of file
+        else:
+            QMessageBox.critical(self, "保存失败", info)
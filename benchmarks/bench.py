@@ -0,0 +1,313 @@
+"""
+离线性能基准
+用本地 HTTP 服务提供合成 RSS，用带可调延迟的假翻译器代替 Google 翻译，
+测量单地区日报、全球导出、词云生成三个场景的吞吐、延迟分位数、峰值内存与 CPU 时间
+
+用法:
+    python -m benchmarks.bench
+    python -m benchmarks.bench --feeds 50 --items 40 --concurrency 8 --translate-latency 0.2
+    python -m benchmarks.bench --scenarios export --iterations 5 --warm --json result.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from xml.sax.saxutils import escape
+
+_WORDS = ("economy market election storm minister court climate energy trade summit "
+          "police football bank policy health school border report talks vote").split()
+_SOURCES = ["Reuters", "BBC", "CNN", "AP", "Bloomberg", "The Guardian"]
+
+
+# ==========================================
+# 1. 本地 RSS 服务
+# ==========================================
+def synthetic_feed(feed_id, items, seed=0):
+    """生成一份 Google News 风格的 RSS (标题格式为 "标题 - 来源")"""
+    rng = random.Random(f"{seed}-{feed_id}")
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>',
+             f"<title>Feed {feed_id}</title>"]
+    for i in range(items):
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 12))).capitalize()
+        source = rng.choice(_SOURCES)
+        parts.append(
+            f"<item><title>{escape(title)} - {source}</title>"
+            f"<link>http://bench.local/{feed_id}/{i}</link>"
+            f"<pubDate>{formatdate(usegmt=True)}</pubDate>"
+            f"<description>{escape(title)}</description></item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+class FeedServer:
+    """
+    在后台线程运行的本地 RSS 服务
+    路径 /feed/<编号>，支持 ETag / 304，可配置每次响应的延迟
+    """
+
+    def __init__(self, items=20, latency=0.0):
+        self.items = items
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self._bodies = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                feed_id = urlparse(self.path).path.rsplit("/", 1)[-1]
+                body = server.body(feed_id)
+                etag = f'"{feed_id}-{len(body)}"'
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def body(self, feed_id):
+        with self._lock:
+            if feed_id not in self._bodies:
+                self._bodies[feed_id] = synthetic_feed(feed_id, self.items)
+            return self._bodies[feed_id]
+
+    def url(self, feed_id):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/feed/{feed_id}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ==========================================
+# 2. 假翻译器
+# ==========================================
+class FakeTranslator:
+    """模拟 GoogleTranslator：每次请求固定延迟，逐行加前缀，保留换行 (打包批量翻译依赖这一点)"""
+
+    calls = 0
+    chars = 0
+    _lock = threading.Lock()
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def translate(self, text):
+        with FakeTranslator._lock:
+            FakeTranslator.calls += 1
+            FakeTranslator.chars += len(text)
+        if self.latency:
+            time.sleep(self.latency)
+        return "\n".join(f"译:{line}" for line in text.split("\n"))
+
+
+# ==========================================
+# 3. 环境准备
+# ==========================================
+def configure(args, server, root):
+    """
+    在导入核心模块之前改写配置：RSS 源指向本地服务，缓存和存档写到临时目录
+    必须在导入 app.core.* 之前调用
+    关键词子进程会重新导入配置模块，看不到这里的改写；
+    它们用到的路径 (CACHE_DIR、JIEBA_*) 由进程池初始化参数从主进程传入，其余配置在子进程中不生效
+    """
+    from app.config import settings
+
+    settings.USER_DATA_DIR = root
+    settings.CACHE_DIR = os.path.join(root, "cache")
+    settings.ARCHIVE_PATH = os.path.join(root, "archive.sqlite3")
+    settings.JIEBA_USER_DICT = os.path.join(root, "user_dict.txt")
+    settings.JIEBA_STOPWORDS = os.path.join(root, "stopwords.txt")
+    settings.FETCH_MAX_WORKERS = args.concurrency
+    settings.TRANSLATE_MAX_WORKERS = args.concurrency
+    settings.PER_HOST_MIN_INTERVAL = args.host_interval
+    settings.COUNTRY_CONFIGS.clear()
+    settings.COUNTRY_CONFIGS.update({f"地区{i:03d} (R{i:03d})": {"url": server.url(i)} for i in range(args.feeds)})
+
+    from app.core import api
+    api._get_translator = lambda target_lang, source_lang='auto': FakeTranslator(args.translate_latency)
+
+    # 关键词进程池的启动和 jieba 词典加载只发生一次，不计入场景耗时
+    if "wordcloud" in args.scenarios:
+        from app.core.keywords import warm_keyword_pool
+        warm_keyword_pool()
+
+
+def reset_caches(root):
+    """清空所有缓存 (冷启动场景)"""
+    from app.core import archive, cache, feed_cache, parser, wordcloud_render
+
+    cache._translation_cache = None
+    feed_cache._feed_cache = None
+    archive._archive = None
+    parser._parsed_cache.clear()
+    wordcloud_render.render_cache = wordcloud_render.RenderCache()
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root, exist_ok=True)
+
+
+# ==========================================
+# 4. 场景
+# ==========================================
+def scenario_view(args, tmp_dir):
+    """单地区日报 (抓取 + 解析 + 翻译 + 存档)"""
+    from app.config.settings import COUNTRY_CONFIGS
+    from app.core.api import fetch_news_data
+    url = next(iter(COUNTRY_CONFIGS.values()))["url"]
+    return len(fetch_news_data(url, do_translate=True))
+
+
+def scenario_export(args, tmp_dir):
+    """全球导出"""
+    from app.core.service import build_export_header, export_global_report
+    counter = [0]
+    export_global_report(os.path.join(tmp_dir, "export"), build_export_header("bench"),
+                         on_region=lambda name, items, status: counter.__setitem__(0, counter[0] + len(items)))
+    return counter[0]
+
+
+def scenario_wordcloud(args, tmp_dir):
+    """词云 (抓取 + 翻译 + 关键词提取 + 渲染)"""
+    from app.config.settings import COUNTRY_CONFIGS
+    from app.core.service import keyword_report
+    from app.core.wordcloud_render import RENDER_PARAMS, render_word_cloud
+    url = next(iter(COUNTRY_CONFIGS.values()))["url"]
+    keywords_list, _ = keyword_report(url, "en")
+    if not keywords_list:
+        return 0
+    render_word_cloud(dict(keywords_list), RENDER_PARAMS)
+    return len(keywords_list)
+
+
+SCENARIOS = {"view": scenario_view, "export": scenario_export, "wordcloud": scenario_wordcloud}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """进程峰值常驻内存 (MB)，不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name, args, server, root):
+    func = SCENARIOS[name]
+    latencies, items = [], 0
+    requests_before, calls_before = server.requests, FakeTranslator.calls
+
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(args.iterations):
+        if not args.warm:
+            reset_caches(os.path.join(root, "state"))
+        start = time.perf_counter()
+        items += func(args, root)
+        latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "iterations": args.iterations,
+        "items": items,
+        "throughput_items_per_s": items / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "cpu_s": cpu,
+        "peak_python_alloc_mb": peak_traced / (1024 * 1024),
+        "peak_rss_mb": peak_rss_mb(),
+        "http_requests": server.requests - requests_before,
+        "translate_requests": FakeTranslator.calls - calls_before,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench", description="离线性能基准")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--feeds", type=int, default=12, help="地区 (RSS 源) 数量")
+    parser.add_argument("--items", type=int, default=20, help="每个源的条目数")
+    parser.add_argument("--concurrency", type=int, default=6, help="并发抓取 / 翻译数")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--feed-latency", type=float, default=0.05, help="本地 RSS 服务每次响应的延迟 (秒)")
+    parser.add_argument("--translate-latency", type=float, default=0.1, help="假翻译器每次请求的延迟 (秒)")
+    parser.add_argument("--host-interval", type=float, default=0.0, help="同一主机请求间隔 (秒)")
+    parser.add_argument("--warm", action="store_true", help="迭代之间保留缓存 (默认每次都清空)")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    root = tempfile.mkdtemp(prefix="news_bench_")
+    try:
+        with FeedServer(items=args.items, latency=args.feed_latency) as server:
+            configure(args, server, os.path.join(root, "state"))
+            results = [run_scenario(name, args, server, root) for name in args.scenarios]
+    finally:
+        # 存档写入后会在后台建立搜索索引，先等分词进程退出再删除临时目录
+        from app.core import keywords
+        if keywords._pool is not None:
+            keywords._pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(root, ignore_errors=True)
+
+    header = f"{'场景':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'条/秒':>10}{'CPU s':>8}{'内存 MB':>9}{'HTTP':>6}{'翻译':>6}"
+    print(header)
+    for r in results:
+        print(f"{r['scenario']:<10}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+              f"{r['throughput_items_per_s']:>10.1f}{r['cpu_s']:>8.2f}{r['peak_python_alloc_mb']:>9.1f}"
+              f"{r['http_requests']:>6}{r['translate_requests']:>6}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
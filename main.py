@@ -1,7 +1,7 @@
 import sys
 import os
-from PyQt6.QtWidgets import QApplication
-from app.ui.main_window import MainWindow
+import multiprocessing
+from app.core.startup import profiler, start_background_warm_up
 
 
 def load_stylesheet(app):
@@ -18,15 +18,41 @@ def load_stylesheet(app):
 
 
 def main():
-    app = QApplication(sys.argv)
+    # --startup-profile: 打印各启动阶段的导入与初始化耗时
+    argv = list(sys.argv)
+    if "--startup-profile" in argv:
+        argv.remove("--startup-profile")
+        profiler.enabled = True
+
+    with profiler.phase("import PyQt6"):
+        from PyQt6.QtCore import QTimer
+        from PyQt6.QtWidgets import QApplication
+    with profiler.phase("import MainWindow"):
+        from app.ui.main_window import MainWindow
+
+    with profiler.phase("QApplication()"):
+        app = QApplication(argv)
 
     # 加载样式
-    load_stylesheet(app)
+    with profiler.phase("load_stylesheet"):
+        load_stylesheet(app)
+
+    with profiler.phase("MainWindow()"):
+        window = MainWindow()
+    with profiler.phase("window.show()"):
+        window.show()
+
+    def on_first_frame():
+        profiler.mark("事件循环开始 (首帧)")
+        profiler.report()
+        # 窗口显示之后再在后台预热 jieba / wordcloud / 翻译模块
+        start_background_warm_up()
 
-    window = MainWindow()
-    window.show()
+    QTimer.singleShot(0, on_first_frame)
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # 关键词提取使用进程池，打包成 exe 后需要 freeze_support
+    multiprocessing.freeze_support()
+    main()